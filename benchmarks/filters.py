@@ -0,0 +1,90 @@
+"""
+Axis filtering cost at 1 kHz x 4 axes: one second of gamepad input
+through FilterPipeline, frame by frame and as a single batch, against
+shaping every event with plain Python math. Usage:
+
+    python benchmarks/filters.py [--seconds N]
+"""
+import os
+import random
+import sys
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'src'))
+
+from devices.evdev import EV_ABS, EV_SYN, SYN_REPORT, RawEvent  # noqa
+from devices.filters import STICKS, AxisFilter, FilterPipeline  # noqa
+
+RATE = 1000
+
+
+def frames(seconds: int):
+    """
+    Gamepad reports moving all four stick axes.
+    """
+    result = []
+
+    for i in range(RATE * seconds):
+        timestamp = i * 1000000000 // RATE
+        frame = [RawEvent(timestamp, EV_ABS, code, random.randint(-32768, 32767))
+                 for code in STICKS]
+        frame.append(RawEvent(timestamp, EV_SYN, SYN_REPORT, 0))
+        result.append(frame)
+
+    return result
+
+
+def per_event(data, axis: AxisFilter) -> None:
+    """
+    Baseline, curve math evaluated for every event.
+    """
+    values = dict.fromkeys(STICKS, 0.)
+    alpha = 1 - axis.smoothing
+    deadzone, expo = axis.deadzone, axis.expo
+
+    for frame in data:
+        for event in frame:
+            if event.type == EV_ABS:
+                value = event.value / 32768
+                magnitude = min(abs(value), 1.)
+                target = 0.
+
+                if magnitude > deadzone:
+                    magnitude = (magnitude - deadzone) / (1 - deadzone)
+                    magnitude = (1 - expo) * magnitude + expo * magnitude ** 3
+                    target = magnitude if value > 0 else -magnitude
+
+                values[event.code] += alpha * (target - values[event.code])
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seconds', type=int, default=5)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    pipeline = FilterPipeline()
+    print('lookup tables built in {:.1f} ms'.format(
+        (time.perf_counter() - start) * 1000))
+
+    data = frames(args.seconds)
+
+    def frame_by_frame():
+        for frame in data:
+            pipeline.update(frame)
+
+    for name, run in (('per event', lambda: per_event(data, pipeline.filters[0])),
+                      ('per frame', frame_by_frame),
+                      ('batch', lambda: pipeline.update_batch(data))):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+
+        print('{:<10} {:8.2f} us/frame  {:5.2f}% of one core at {} Hz'.format(
+            name, elapsed / len(data) * 1e6, elapsed / args.seconds * 100, RATE))
+
+
+if __name__ == '__main__':
+    main()
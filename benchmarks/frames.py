@@ -0,0 +1,85 @@
+"""
+Consumer cost per gamepad report: one await per event through the
+device buffer against one await per SYN_REPORT frame. Usage:
+
+    python benchmarks/frames.py [--rate FRAMES_PER_SECOND] [--seconds N]
+"""
+import asyncio
+import itertools
+import os
+import sys
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'src'))
+
+from devices.evdev import EV_SYN  # noqa
+from devices.virtual import VirtualGamePad, random_sticks  # noqa
+
+
+async def per_event(device: VirtualGamePad) -> int:
+    """
+    Supervised reader filling the buffer, consumer awaiting each event.
+    """
+    reports = 0
+    reader = asyncio.ensure_future(device.start())
+
+    try:
+        while True:
+            event = await device.get()
+            if event.type == EV_SYN:
+                reports += 1
+    except asyncio.CancelledError:
+        await asyncio.wait_for(device.stop(), 1)
+        await asyncio.wait_for(reader, 1)
+        return reports
+
+
+async def per_frame(device: VirtualGamePad) -> int:
+    """
+    Consumer iterating over whole frames.
+    """
+    reports = 0
+
+    try:
+        async for _ in device:
+            reports += 1
+    except asyncio.CancelledError:
+        return reports
+
+
+async def run(consumer, frames: int, rate: float):
+    loop = asyncio.get_event_loop()
+    device = VirtualGamePad(loop=loop, maxsize=4096)
+    lost = device._put_timeouts.value
+    task = loop.create_task(consumer(device))
+
+    start = time.process_time()
+    await device.play(itertools.islice(random_sticks(), frames), rate)
+    await asyncio.sleep(.1)
+
+    task.cancel()
+    reports = await task
+    elapsed = time.process_time() - start
+    device.close()
+
+    return reports, device._put_timeouts.value - lost, elapsed
+
+
+async def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rate', type=int, default=10000)
+    parser.add_argument('--seconds', type=float, default=3)
+    args = parser.parse_args()
+
+    frames = int(args.rate * args.seconds)
+
+    for name, consumer in (('per event', per_event), ('per frame', per_frame)):
+        reports, lost, elapsed = await run(consumer, frames, args.rate)
+        print('{:<10} {:>8} reports  {:6.2f} us/report CPU  {:>8} events lost'.format(
+            name, reports, elapsed / max(reports, 1) * 1e6, lost))
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
@@ -0,0 +1,58 @@
+"""
+Throughput of AsyncIteratorExecutor against PrefetchIteratorExecutor,
+in items per second. Usage:
+
+    python benchmarks/iterator.py [--items N] [--prefetch K]
+"""
+import asyncio
+import os
+import sys
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'src'))
+
+from utils.iterator import AsyncIteratorExecutor, PrefetchIteratorExecutor  # noqa
+
+
+def blocking(items: int):
+    """
+    Iterator that releases the GIL on every item, as a device or
+    file reader would do.
+    """
+    for i in range(items):
+        time.sleep(0)
+        yield i
+
+
+async def consume(iterator) -> float:
+    start = time.perf_counter()
+    count = 0
+
+    async for _ in iterator:
+        count += 1
+
+    return count / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--items', type=int, default=20000)
+    parser.add_argument('--prefetch', type=int, default=64)
+    args = parser.parse_args()
+
+    loop = asyncio.get_event_loop()
+
+    for name, source in (('range', lambda: iter(range(args.items))),
+                         ('blocking', lambda: blocking(args.items))):
+        current = await consume(AsyncIteratorExecutor(source(), loop=loop))
+        prefetch = await consume(PrefetchIteratorExecutor(
+            source(), loop=loop, prefetch=args.prefetch))
+
+        print('{:<10} executor {:>10.0f} items/s  prefetch {:>10.0f} items/s  x{:.1f}'.format(
+            name, current, prefetch, prefetch / current))
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
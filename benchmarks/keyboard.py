@@ -0,0 +1,105 @@
+"""
+Keyboard as joystick under heavy rollover and autorepeat storms: cost
+of KeyboardStick (bitmap updates, axes evaluated once per tick) against
+evaluating the axes on every key event. Usage:
+
+    python benchmarks/keyboard.py [--seconds N] [--keys N] [--repeat HZ]
+"""
+import os
+import random
+import sys
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'src'))
+
+from config.settings import CONTROL_RATE  # noqa
+from devices.controllers import KEYBOARD_AXES, KeyboardStick  # noqa
+from devices.evdev import EV_KEY, EV_SYN, SYN_REPORT, RawEvent  # noqa
+
+# Keys that don't drive any axis, held to load the rollover
+OTHER_KEYS = [code for code in range(2, 100)
+              if code not in KeyboardStick.EVENTS[EV_KEY]]
+
+
+def storm(seconds: int, keys: int, repeat: float):
+    """
+    Ticks worth of events: 'keys' keys held down, each autorepeating at
+    'repeat' Hz, while the axis keys are pressed and released randomly.
+    """
+    held = random.sample(OTHER_KEYS, keys)
+    axis_keys = list(KeyboardStick.EVENTS[EV_KEY])
+    per_tick = max(int(keys * repeat / CONTROL_RATE), 1)
+    pressed = set()
+    ticks = []
+
+    for tick in range(int(seconds * CONTROL_RATE)):
+        timestamp = tick * int(1e9 / CONTROL_RATE)
+        events = [RawEvent(timestamp, EV_KEY, code, 1) for code in held] if not tick else []
+
+        for i in range(per_tick):
+            events.append(RawEvent(timestamp, EV_KEY, held[i % keys], 2))
+            events.append(RawEvent(timestamp, EV_SYN, SYN_REPORT, 0))
+
+        code = random.choice(axis_keys)
+        events.append(RawEvent(timestamp, EV_KEY, code, 0 if code in pressed else 1))
+        events.append(RawEvent(timestamp, EV_SYN, SYN_REPORT, 0))
+        pressed ^= {code}
+        ticks.append(events)
+
+    return ticks
+
+
+def per_event(ticks) -> None:
+    """
+    Baseline, a set of held keys and the axes evaluated on every event.
+    """
+    held = set()
+    axes = dict.fromkeys(('roll', 'pitch', 'throttle', 'yaw'), 0.)
+
+    for events in ticks:
+        for event in events:
+            if event.type != EV_KEY:
+                continue
+            if event.value:
+                held.add(event.code)
+            else:
+                held.discard(event.code)
+
+            for axis, negative, positive in KEYBOARD_AXES:
+                axes[axis] = (positive in held) - (negative in held)
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seconds', type=int, default=10)
+    parser.add_argument('--keys', type=int, default=20)
+    parser.add_argument('--repeat', type=float, default=30)
+    args = parser.parse_args()
+
+    ticks = storm(args.seconds, args.keys, args.repeat)
+    events = sum(len(events) for events in ticks)
+    stick = KeyboardStick()
+
+    def per_tick():
+        for events in ticks:
+            stick.feed_batch(events)
+            stick.tick()
+
+    print('{} events, {:.0f} per tick, {} keys held'.format(
+        events, events / len(ticks), args.keys))
+
+    for name, run in (('per event', lambda: per_event(ticks)),
+                      ('per tick', per_tick)):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+
+        print('{:<10} {:8.3f} us/event  {:8.2f} us/tick  {:5.2f}% of one core'.format(
+            name, elapsed / events * 1e6, elapsed / len(ticks) * 1e6,
+            elapsed / args.seconds * 100))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Replays a link capture through the packet codec and the telemetry
+decoders at maximum speed, reporting decoder throughput. Without a
+capture, one is recorded first from synthetic traffic, measuring the
+cost of capturing on the send path. Usage:
+
+    python benchmarks/replay.py [CAPTURE] [--frames N]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'src'))
+
+from core.capture import RECEIVED, SENT, LinkCapture, read_capture, replay  # noqa
+from core.packet import stick_packet  # noqa
+from core.telemetry import FlightData, WifiData  # noqa
+
+
+def record(path: str, frames: int) -> float:
+    """
+    Records sticks sent at the control rate mixed with telemetry,
+    returns the capture cost per frame in seconds.
+    """
+    sent = [stick_packet(random.uniform(-1, 1), random.uniform(-1, 1),
+                         random.uniform(-1, 1), random.uniform(-1, 1)).encode(0)
+            for _ in range(100)]
+    received = [FlightData(height=i).packet().encode(i) for i in range(100)]
+    received.append(WifiData(strength=90).packet().encode(1))
+
+    with LinkCapture(path) as capture:
+        start = time.perf_counter()
+
+        for i in range(frames):
+            if i & 1:
+                capture.record(RECEIVED, received[i % len(received)])
+            else:
+                capture.record(SENT, sent[i % len(sent)])
+
+        elapsed = time.perf_counter() - start
+
+    return elapsed / frames
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('capture', nargs='?')
+    parser.add_argument('--frames', type=int, default=200000)
+    args = parser.parse_args()
+
+    path = args.capture
+
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), 'link.pcap')
+        cost = record(path, args.frames)
+        print('capture  {:8.3f} us/frame  {:>10} bytes'.format(
+            cost * 1e6, os.path.getsize(path)))
+
+    start = time.perf_counter()
+    frames = list(read_capture(path))
+    elapsed = time.perf_counter() - start
+    print('read     {:8.3f} us/frame  {:>10} frames'.format(
+        elapsed / max(len(frames), 1) * 1e6, len(frames)))
+
+    start = time.perf_counter()
+    counts = replay(frames)
+    elapsed = time.perf_counter() - start
+    print('decode   {:8.3f} us/frame  {:>10.0f} frames/s  {}'.format(
+        elapsed / max(len(frames), 1) * 1e6, len(frames) / elapsed, dict(counts)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Soak test of the device buffer and the stick scheduler with a virtual
+gamepad generating random stick frames at a fixed event rate, read by
+the supervised device pump. Runs that fall short of the requested rate
+exit with status 1. Usage:
+
+    python benchmarks/soak.py [--rate EVENTS_PER_SECOND] [--seconds N]
+"""
+import asyncio
+import itertools
+import os
+import sys
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'src'))
+
+from core.packet import stick_packet  # noqa
+from core.scheduler import LaneScheduler  # noqa
+from devices.filters import FilterPipeline  # noqa
+from devices.virtual import VirtualGamePad, random_sticks  # noqa
+
+# Four axes and a SYN_REPORT
+EVENTS_PER_FRAME = 5
+
+
+async def main() -> bool:
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rate', type=int, default=50000)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    loop = asyncio.get_event_loop()
+    device = VirtualGamePad(loop=loop, maxsize=4096)
+    scheduler = LaneScheduler(loop=loop)
+    pipeline = FilterPipeline.from_device(device.fd)
+    received = 0
+
+    async def control():
+        nonlocal received
+
+        while True:
+            events = await device.get_all()
+            received += len(events)
+            pipeline.update(events)
+            scheduler.put_nowait(stick_packet(*pipeline.values))
+
+    async def send():
+        while True:
+            await scheduler.get()
+
+    supervisor = loop.create_task(device.start())
+    tasks = [loop.create_task(coro()) for coro in (control, send)]
+
+    frames = int(args.rate / EVENTS_PER_FRAME * args.seconds)
+    start = time.perf_counter()
+    written = await device.play(
+        itertools.islice(random_sticks(), frames), args.rate / EVENTS_PER_FRAME)
+    elapsed = time.perf_counter() - start
+    # Lets the consumers drain what is still in flight.
+    await asyncio.sleep(.1)
+
+    for task in tasks:
+        task.cancel()
+
+    await device.stop()
+    await supervisor
+    stick = scheduler.stats()['stick']
+
+    print('written  {:>10} events  {:>10.0f} events/s'.format(written, written / elapsed))
+    print('received {:>10} events  {:>10.0f} events/s'.format(received, received / elapsed))
+    print('expired  {:>10}'.format(device._events_expired.value))
+    print('timeouts {:>10}'.format(device._put_timeouts.value))
+    print('sticks   {:>10} sent {:>10} superseded  {:.3f} ms max delay'.format(
+        stick['sent'], stick['dropped'], stick['max_delay']))
+
+    shortfall = received < written or written / elapsed < args.rate * .95
+    if shortfall:
+        print('SHORTFALL: {:.0f} events/s written, {} requested, {} of {} received'.format(
+            written / elapsed, args.rate, received, written))
+
+    return not shortfall
+
+
+if __name__ == '__main__':
+    sys.exit(0 if asyncio.get_event_loop().run_until_complete(main()) else 1)
@@ -0,0 +1,108 @@
+"""
+Startup benchmark based on ``python -X importtime``.
+
+Runs the CLI with a few light subcommands and reports the cumulative
+import time of the project's own imports (everything imported after
+the interpreter bootstrap) together with the wall-clock time compared
+with a bare ``python -c pass``. Usage:
+
+    python benchmarks/startup.py [--runs N] [--target MS]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser
+from typing import List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE = os.path.join(ROOT, 'src')
+
+# Modules imported by the interpreter itself before running any code,
+# 'runpy' included since it's what executes the source directory.
+BOOTSTRAP = {
+    '_frozen_importlib_external', 'zipimport', 'encodings', 'site',
+    'encodings.utf_8', 'encodings.latin_1', 'encodings.aliases',
+    '_signal', 'io', 'runpy',
+}
+
+COMMANDS: Tuple[Tuple[str, ...], ...] = (
+    ('--version',),
+    ('devices', '--list'),
+)
+
+
+def import_time(stderr: str) -> float:
+    """
+    Sum of the cumulative time, in milliseconds, of every top level
+    import reported by '-X importtime' excluding the bootstrap.
+
+    :param stderr:
+    :return:
+    """
+    total = 0
+
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+
+        _, cumulative, name = line[len('import time:'):].split('|')
+
+        # Nested imports are indented and already accounted for.
+        if name.startswith('  ') or name.strip() in BOOTSTRAP:
+            continue
+
+        total += int(cumulative)
+
+    return total / 1000
+
+
+def run(args: List[str]) -> Tuple[float, float]:
+    """
+    Runs a single command returning import and wall-clock times.
+
+    :param args:
+    :return:
+    """
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime'] + args,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        universal_newlines=True, cwd=ROOT
+    )
+    wall = (time.perf_counter() - start) * 1000
+
+    return import_time(process.stderr), wall
+
+
+def main() -> int:
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--target', type=float, default=50.,
+                        help='Import time budget in milliseconds')
+    args = parser.parse_args()
+
+    baseline = statistics.median(
+        run(['-c', 'pass'])[1] for _ in range(args.runs))
+    print('interpreter baseline: {:.1f} ms'.format(baseline))
+
+    failed = False
+
+    for command in COMMANDS:
+        samples = [run([SOURCE] + list(command)) for _ in range(args.runs)]
+        imports = statistics.median(sample[0] for sample in samples)
+        wall = statistics.median(sample[1] for sample in samples)
+
+        ok = imports < args.target
+        failed |= not ok
+
+        print('{:<20} imports {:6.1f} ms  wall {:6.1f} ms (+{:.1f})  {}'.format(
+            ' '.join(command), imports, wall, wall - baseline,
+            'ok' if ok else 'over {:.0f} ms target'.format(args.target)))
+
+    return int(failed)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,17 +1,16 @@
-import logging
 import io
-import asyncio
 import textwrap
 import sys
 from argparse import ArgumentParser, RawDescriptionHelpFormatter
-from typing import Callable, Text
+from typing import Callable, Text, TYPE_CHECKING
 
 from config import __version__
 from config.settings import DEBUG
 from devices.command import CommandMixin as DeviceMixin
+from simulator.command import SimulatorMixin
 
-
-logger = logging.getLogger(__name__)
+if TYPE_CHECKING:
+    import asyncio
 
 
 def get_version() -> str:
@@ -23,7 +22,7 @@ def get_version() -> str:
     return str(__version__)
 
 
-class Command(DeviceMixin):
+class Command(DeviceMixin, SimulatorMixin):
     __epilog: str = '''
         | One app to rule them all.
     '''
@@ -33,6 +32,7 @@ class Command(DeviceMixin):
 
         The following commands are available:
             devices    Utilities for handle your devices
+            simulator  Drone simulator speaking the protocol over local UDP
             ui         Interface based in curses
     ''')
 
@@ -41,10 +41,7 @@ class Command(DeviceMixin):
 
         """
         self.stdout = sys.stdout
-        self._loop = asyncio.get_event_loop()
-
-        if DEBUG:
-            self.__debug()
+        self.__loop: 'asyncio.AbstractEventLoop' = None
 
         parser = self.create_parser()
 
@@ -59,6 +56,25 @@ class Command(DeviceMixin):
         # Use dispatch pattern to invoke method with same name
         getattr(self, args.command)()
 
+    @property
+    def _loop(self) -> 'asyncio.AbstractEventLoop':
+        """
+        Event loop shared by all subcommands. It's created on first
+        access so that commands like '--version' never pay for
+        importing asyncio.
+
+        :return:
+        """
+        if self.__loop is None:
+            import asyncio
+
+            self.__loop = asyncio.get_event_loop()
+
+            if DEBUG:
+                self.__debug()
+
+        return self.__loop
+
     def create_parser(self) -> ArgumentParser:
         """
 
@@ -113,10 +129,12 @@ class Command(DeviceMixin):
 
         :return:
         """
+        import logging
+
         logging.basicConfig(level=logging.DEBUG)
 
-        self._loop.set_debug(True)
-        self._loop.slow_callback_duration = 200
+        self.__loop.set_debug(True)
+        self.__loop.slow_callback_duration = 200
 
     def _redirect_output(self, func: Callable[[], None]) -> Text:
         """
@@ -3,3 +3,59 @@ from typing import Tuple
 
 DEBUG = True
 SCAN_TIMER_RANGE: Tuple[float, float] = (3, 5)
+
+# Stick axes filtering, see devices.filters
+AXIS_DEADZONE: float = .05
+AXIS_EXPO: float = .3
+AXIS_SMOOTHING: float = .5
+
+# Drone link
+DRONE_ADDRESS: Tuple[str, int] = ('192.168.10.1', 8889)
+LOCAL_PORT: int = 9000
+VIDEO_PORT: int = 6038
+
+# Link captures, bytes buffered before a write, see core.capture
+CAPTURE_BUFFER_SIZE: int = 1 << 16
+
+# Flight logs, see core.flightlog
+FLIGHT_LOG_CHUNK_ROWS: int = 4096
+FLIGHT_LOG_COMPRESSION: int = 6
+
+# Maximum time between the presses of a button sequence
+COMBO_TIMEOUT: float = .5
+
+# Control loop rate, in Hz
+CONTROL_RATE: float = 50
+
+# Mouse as joystick: stick travel per mouse count and spring-back
+# time constant in seconds
+MOUSE_STICK_GAIN: float = .01
+MOUSE_WHEEL_GAIN: float = .1
+MOUSE_STICK_RELEASE: float = .15
+
+# Keyboard as joystick: stick travel per second while a key is held
+# and while returning to the center
+KEYBOARD_RAMP: float = 2.
+KEYBOARD_RELEASE: float = 4.
+
+# Sampling profiler rate, in Hz
+PROFILE_RATE: float = 1000
+
+# Simulator: telemetry rates in Hz and video frame rate
+SIMULATOR_FLIGHT_RATE: float = 10
+SIMULATOR_WIFI_RATE: float = 5
+SIMULATOR_VIDEO_FPS: float = 30
+
+# Adaptive video bitrate, see core.bitrate
+BITRATE_PERIOD: float = 1.
+BITRATE_UP_PERIODS: int = 5
+BITRATE_WEAK_SIGNAL: int = 50
+BITRATE_STRONG_SIGNAL: int = 70
+BITRATE_LOSS_HIGH: float = .05
+BITRATE_LOSS_LOW: float = .01
+BITRATE_RTT_MARGIN: float = .03
+
+# Device supervisor: first and maximum delay, in seconds, between
+# restarts of an unplugged device, and directories watched for replugs
+RESTART_DELAY: Tuple[float, float] = (.05, 10)
+HOTPLUG_PATHS: Tuple[str, ...] = ('/dev/input', '/dev/input/by-id')
@@ -0,0 +1,166 @@
+import asyncio
+from typing import Optional, Tuple
+
+from config.settings import (
+    BITRATE_PERIOD, BITRATE_UP_PERIODS, BITRATE_WEAK_SIGNAL, BITRATE_STRONG_SIGNAL,
+    BITRATE_LOSS_HIGH, BITRATE_LOSS_LOW, BITRATE_RTT_MARGIN
+)
+
+from .link import Link
+from .packet import Packet
+from .protocol import (
+    VIDEO_DYN_ADJ_RATE_CMD, VIDEO_ENCODER_RATE_CMD, VIDEO_RATE_QUERY, WIFI_MSG
+)
+from .telemetry import WifiData
+from .video import VideoReceiver
+
+
+# Encoder rate values from lowest to highest: 1, 1.5, 2, 3 and 4 Mbps.
+RATES: Tuple[int, ...] = (1, 2, 3, 4, 5)
+
+
+class BitrateController(object):
+
+    def __init__(self, link: Link, video: VideoReceiver = None, *,
+                 rates: Tuple[int, ...] = RATES, initial: int = 2,
+                 period: float = BITRATE_PERIOD,
+                 loop: asyncio.AbstractEventLoop = None):
+        """
+        Adapts the video encoder rate to the link quality so video
+        never delays the control channel. Every period it looks at the
+        WIFI_MSG signal strength, the video frames lost and the command
+        round trip time: the rate steps down as soon as any of them
+        degrades, and only steps up after several healthy periods in a
+        row with stricter thresholds.
+
+        :param link:
+        :param video: source of the video frame loss, if any.
+        :param rates: encoder rate values from lowest to highest.
+        :param initial: index of the initial rate.
+        :param period: seconds between evaluations.
+        :param loop:
+        """
+        if loop is None:
+            self._loop = asyncio.get_event_loop()
+        else:
+            self._loop = loop
+
+        self.link = link
+        self.video = video
+        self.rates = rates
+        self.level = initial
+        self.period = period
+
+        self.strength: Optional[int] = None
+        self.loss = 0.
+        self.baseline: Optional[float] = None
+
+        self._healthy = 0
+        self._frames = self._lost = 0
+        self.task_tick: Optional[asyncio.Task] = None
+
+        link.subscribe(WIFI_MSG, self.on_wifi)
+
+    @property
+    def rate(self) -> int:
+        return self.rates[self.level]
+
+    def on_wifi(self, packet: Packet) -> None:
+        self.strength = WifiData.decode(packet.payload).strength
+
+    def _video_loss(self) -> float:
+        """
+        Ratio of video frames lost since the last call.
+
+        :return:
+        """
+        if self.video is None:
+            return 0.
+
+        frames = self.video.frames.value - self._frames
+        lost = self.video.lost.value - self._lost
+        self._frames, self._lost = self.video.frames.value, self.video.lost.value
+
+        return lost / (frames + lost) if frames + lost else 0.
+
+    def evaluate(self) -> bool:
+        """
+        Updates the rate level, returns whether it changed.
+
+        :return:
+        """
+        self.loss = self._video_loss()
+        rtt = self.link.rtt.value
+
+        if rtt and (self.baseline is None or rtt < self.baseline):
+            self.baseline = rtt
+
+        # The last answered probe says nothing about probes lost to
+        # congestion, an unanswered probe delays at least its age.
+        rtt = max(rtt, self.link.overdue(VIDEO_RATE_QUERY))
+        delay = rtt - (self.baseline or 0.)
+        strength = self.strength if self.strength is not None else BITRATE_STRONG_SIGNAL
+
+        congested = (strength < BITRATE_WEAK_SIGNAL or self.loss > BITRATE_LOSS_HIGH or
+                     delay > BITRATE_RTT_MARGIN)
+        healthy = (strength >= BITRATE_STRONG_SIGNAL and self.loss <= BITRATE_LOSS_LOW and
+                   delay <= BITRATE_RTT_MARGIN / 2)
+
+        level = self.level
+
+        if congested:
+            self._healthy = 0
+            level = max(level - 1, 0)
+
+        elif healthy:
+            self._healthy += 1
+            if self._healthy >= BITRATE_UP_PERIODS:
+                self._healthy = 0
+                level = min(level + 1, len(self.rates) - 1)
+
+        else:
+            self._healthy = 0
+
+        changed, self.level = level != self.level, level
+        return changed
+
+    def send_rate(self) -> None:
+        self.link.scheduler.put_nowait(
+            Packet(VIDEO_ENCODER_RATE_CMD, bytes((self.rate,))))
+
+    async def on_tick(self) -> None:
+        """
+        Evaluates the link every period. A rate query is sent every
+        time, its answer keeps the round trip time up to date.
+
+        :return:
+        """
+        while True:
+            await asyncio.sleep(self.period)
+
+            if self.evaluate():
+                self.send_rate()
+
+            self.link.scheduler.put_nowait(Packet(VIDEO_RATE_QUERY))
+
+    def start(self) -> None:
+        """
+        Takes over the encoder rate, disabling the drone's own dynamic
+        adjustment.
+
+        :return:
+        """
+        self.link.scheduler.put_nowait(Packet(VIDEO_DYN_ADJ_RATE_CMD, b'\x00'))
+        self.send_rate()
+        self.task_tick = self._loop.create_task(self.on_tick())
+
+    async def stop(self) -> None:
+        if self.task_tick is None:
+            return
+
+        self.task_tick.cancel()
+
+        try:
+            await self.task_tick
+        except asyncio.CancelledError:
+            pass
@@ -0,0 +1,218 @@
+import collections
+import queue
+import struct
+import threading
+import time
+from typing import Dict, Iterator, NamedTuple, Optional
+
+from config.settings import CAPTURE_BUFFER_SIZE
+
+from .packet import Packet, PacketError
+from .protocol import FLIGHT_MSG, STICK_CMD, WIFI_MSG
+from .telemetry import FlightData, Sticks, WifiData
+
+
+# pcap file header with nanosecond timestamps: magic, version 2.4,
+# timezone, accuracy, snapshot length and link type. Every frame
+# starts with a direction byte, the link type is the first one
+# reserved for private use so analyzers show the raw bytes.
+PCAP_MAGIC = 0xa1b23c4d
+PCAP_HEADER = struct.Struct('<IHHiIII')
+LINKTYPE_USER0 = 147
+SNAPLEN = 0xffff
+
+# seconds, nanoseconds, captured length, original length
+FRAME = struct.Struct('<IIII')
+
+SENT = 0
+RECEIVED = 1
+
+
+class Frame(NamedTuple):
+    """
+    Captured datagram, timestamp in nanoseconds since the epoch.
+    """
+    timestamp: int
+    direction: int
+    data: bytes
+
+
+class LinkCapture(object):
+
+    def __init__(self, path: str, *, buffer_size: int = CAPTURE_BUFFER_SIZE):
+        """
+        Captures the datagrams of a link in a pcap file. Frames are
+        appended to an in-memory buffer, a full buffer is handed over
+        to a writer thread, so the send path never touches the disk.
+        A failed write stops the capture, the error is raised by the
+        next flush and by close.
+
+        :param path:
+        :param buffer_size: bytes buffered before a write.
+        """
+        self.path = path
+        self.frames = 0
+
+        self._buffer_size = buffer_size
+        self._buffer = bytearray()
+
+        self._file = open(path, 'wb')
+        self._file.write(PCAP_HEADER.pack(PCAP_MAGIC, 2, 4, 0, 0, SNAPLEN, LINKTYPE_USER0))
+
+        self._queue = queue.Queue()
+        self._error: Optional[Exception] = None
+        self._writer = threading.Thread(target=self._write, daemon=True)
+        self._writer.start()
+
+    def attach(self, link) -> None:
+        """
+        Captures every datagram sent and received by a link.
+
+        :param link:
+        :return:
+        """
+        link.capture = self
+
+    def record(self, direction: int, data: bytes) -> None:
+        """
+        Appends a datagram to the buffer.
+
+        :param direction: SENT or RECEIVED.
+        :param data:
+        :return:
+        """
+        seconds, nanoseconds = divmod(time.time_ns(), 1000000000)
+        size = len(data) + 1
+
+        buffer = self._buffer
+        buffer += FRAME.pack(seconds, nanoseconds, size, size)
+        buffer.append(direction)
+        buffer += data
+        self.frames += 1
+
+        if len(buffer) >= self._buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Hands the buffered frames over to the writer. Raises the error
+        of a failed write, the buffered frames are dropped.
+
+        :return:
+        """
+        if self._error is not None:
+            self._buffer = bytearray()
+            raise self._error
+
+        if self._buffer:
+            self._queue.put(self._buffer)
+            self._buffer = bytearray()
+
+    def _write(self) -> None:
+        """
+        Worker thread body, writes the buffers.
+
+        :return:
+        """
+        while True:
+            buffer = self._queue.get()
+            if buffer is None:
+                return
+
+            try:
+                self._file.write(buffer)
+            except Exception as error:
+                self._error = error
+                return
+
+    def close(self) -> None:
+        """
+        Writes the pending frames and closes the file. Raises the
+        error of a failed write.
+
+        :return:
+        """
+        try:
+            self.flush()
+        finally:
+            self._queue.put(None)
+            self._writer.join()
+            self._file.close()
+
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def read_capture(path: str) -> Iterator[Frame]:
+    """
+    Yields the frames of a capture.
+
+    :param path:
+    :return:
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+
+    magic, _, _, _, _, _, linktype = PCAP_HEADER.unpack_from(data)
+    if magic != PCAP_MAGIC or linktype != LINKTYPE_USER0:
+        raise ValueError("{} is not a link capture".format(path))
+
+    offset = PCAP_HEADER.size
+    unpack_from = FRAME.unpack_from
+
+    while offset + FRAME.size <= len(data):
+        seconds, nanoseconds, size, _ = unpack_from(data, offset)
+        offset += FRAME.size
+
+        yield Frame(seconds * 1000000000 + nanoseconds, data[offset],
+                    data[offset + 1:offset + size])
+        offset += size
+
+
+# Telemetry decoders by command
+DECODERS = {
+    FLIGHT_MSG: FlightData.decode,
+    WIFI_MSG: WifiData.decode,
+    STICK_CMD: Sticks.decode,
+}
+
+
+def replay(frames: Iterator[Frame]) -> Dict[str, int]:
+    """
+    Feeds captured frames through the packet codec and the telemetry
+    decoders as fast as possible. Returns how many frames ended up
+    where.
+
+    :param frames:
+    :return:
+    """
+    counts: Dict[str, int] = collections.Counter()
+    decode, decoders = Packet.decode, DECODERS
+
+    for frame in frames:
+        try:
+            packet = decode(frame.data)
+        except PacketError:
+            counts['invalid'] += 1
+            continue
+
+        decoder = decoders.get(packet.cmd)
+
+        if decoder is None:
+            counts['packets'] += 1
+            continue
+
+        try:
+            decoder(packet.payload)
+        except struct.error:
+            counts['invalid'] += 1
+        else:
+            counts['telemetry'] += 1
+
+    return counts
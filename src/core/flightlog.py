@@ -0,0 +1,395 @@
+import json
+import mmap
+import queue
+import re
+import struct
+import threading
+import time
+import zlib
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from config.settings import FLIGHT_LOG_CHUNK_ROWS, FLIGHT_LOG_COMPRESSION
+
+from .packet import ACK, Packet
+from .protocol import LOG_DATA_MSG, LOG_HEADER_MSG
+
+
+MAGIC = b'RYZELOG1'
+
+# record id, rows, compressed size
+CHUNK = struct.Struct('<HII')
+# index offset, magic
+TRAILER = struct.Struct('<Q8s')
+
+# start (0x55), length, checksum, record id, xor key
+RECORD = struct.Struct('<BHBHB3x')
+RECORD_START = 0x55
+RECORD_CRC_SIZE = 2
+
+# Layout of the known records: name, struct format and field names.
+RECORDS: Dict[int, Tuple[str, str, Tuple[str, ...]]] = {
+    0x001d: ('mvo', '<2xhhhfff', (
+        'vel_x', 'vel_y', 'vel_z', 'pos_y', 'pos_x', 'pos_z')),
+    0x0800: ('imu', '<20x3f3f4x4f12x3f', (
+        'acc_x', 'acc_y', 'acc_z', 'gyro_x', 'gyro_y', 'gyro_z',
+        'q0', 'q1', 'q2', 'q3', 'vg_x', 'vg_y', 'vg_z')),
+}
+
+
+class LogHeader(NamedTuple):
+    log_id: int
+    build: str
+
+
+class Layout(NamedTuple):
+    """
+    Compiled layout of a record type.
+    """
+    record_id: int
+    name: str
+    struct: struct.Struct
+    fields: Tuple[str, ...]
+    typecodes: str
+
+
+def compile_layout(record_id: int, name: str, fmt: str, fields: Tuple[str, ...]) -> Layout:
+    """
+    Compiles a record format. The array typecode of every field is
+    taken from the format, skipping the padding.
+
+    :param record_id:
+    :param name:
+    :param fmt:
+    :param fields:
+    :return:
+    """
+    typecodes = ''.join(
+        code * int(count or 1)
+        for count, code in re.findall(r'(\d*)([a-zA-Z])', fmt) if code != 'x')
+
+    if len(typecodes) != len(fields):
+        raise ValueError("Layout {} has {} values for {} fields.".format(
+            name, len(typecodes), len(fields)))
+
+    return Layout(record_id, name, struct.Struct(fmt), fields, typecodes)
+
+
+@lru_cache(maxsize=256)
+def xor_table(key: int) -> bytes:
+    """
+    Translation table that XORs every byte with key.
+
+    :param key:
+    :return:
+    """
+    return bytes(i ^ key for i in range(256))
+
+
+def parse_header(payload: bytes) -> LogHeader:
+    """
+    Parses a LOG_HEADER_MSG payload: log id followed by the firmware
+    build description.
+
+    :param payload:
+    :return:
+    """
+    log_id = int.from_bytes(payload[0:2], 'little')
+    build = payload[2:].split(b'\x00', 1)[0].decode('ascii', 'replace').strip()
+
+    return LogHeader(log_id, build)
+
+
+def iter_records(payload: bytes) -> Iterator[Tuple[int, bytes]]:
+    """
+    Splits a LOG_DATA_MSG payload in (record id, decoded data) pairs.
+
+    :param payload:
+    :return:
+    """
+    pos, end = 1, len(payload)
+
+    while pos + RECORD.size + RECORD_CRC_SIZE <= end:
+        start, length, _, record_id, key = RECORD.unpack_from(payload, pos)
+
+        if start != RECORD_START or length < RECORD.size + RECORD_CRC_SIZE:
+            return
+
+        data = payload[pos + RECORD.size:pos + length - RECORD_CRC_SIZE]
+        yield record_id, data.translate(xor_table(key))
+
+        pos += length
+
+
+class ChunkBuffer(object):
+    __slots__ = ('layout', 'rows', 'timestamps', 'count')
+
+    def __init__(self, layout: Layout):
+        """
+        Rows of a record type waiting to be flushed. Rows are kept as
+        raw struct bytes, they are split into columns when flushed so
+        appending a record is a single copy.
+
+        :param layout:
+        """
+        self.layout = layout
+        self.rows = bytearray()
+        self.timestamps = array('d')
+        self.count = 0
+
+    def append(self, timestamp: float, data: bytes) -> None:
+        self.rows += data[:self.layout.struct.size]
+        self.timestamps.append(timestamp)
+        self.count += 1
+
+
+def to_columns(chunk: ChunkBuffer) -> bytes:
+    """
+    Converts the rows of a chunk into concatenated columns, starting
+    with the timestamps.
+
+    :param chunk:
+    :return:
+    """
+    layout = chunk.layout
+    columns = [chunk.timestamps.tobytes()]
+
+    if chunk.count:
+        values = zip(*layout.struct.iter_unpack(chunk.rows))
+
+        for typecode, column in zip(layout.typecodes, values):
+            columns.append(array(typecode, column).tobytes())
+
+    return b''.join(columns)
+
+
+class FlightLogRecorder(object):
+
+    def __init__(self, path: str, *, chunk_rows: int = FLIGHT_LOG_CHUNK_ROWS,
+                 compression: int = FLIGHT_LOG_COMPRESSION):
+        """
+        Records the LOG_DATA_MSG stream of the drone in a columnar
+        file. The header is parsed once into compiled record layouts,
+        records are appended into per type chunk buffers, and full
+        chunks are converted into columns, compressed and written by
+        a worker thread.
+
+        :param path:
+        :param chunk_rows: rows per chunk.
+        :param compression: zlib compression level.
+        """
+        self.path = path
+        self.header: Optional[LogHeader] = None
+        self.layouts: Dict[int, Layout] = {}
+        self.unknown = 0
+
+        self._chunk_rows = chunk_rows
+        self._compression = compression
+        self._chunks: Dict[int, ChunkBuffer] = {}
+        self._index: List[Tuple[int, int, int, int]] = []
+
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC)
+
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write, daemon=True)
+        self._writer.start()
+
+    def attach(self, link) -> None:
+        """
+        Subscribes the recorder to the log messages of a link.
+
+        :param link:
+        :return:
+        """
+        def on_header(packet: Packet) -> None:
+            self.on_header(packet.payload)
+            # The drone keeps sending the header until it's acknowledged.
+            link.scheduler.put_nowait(Packet(
+                LOG_HEADER_MSG, b'\x00' + packet.payload[0:2], ACK))
+
+        link.subscribe(LOG_HEADER_MSG, on_header)
+        link.subscribe(LOG_DATA_MSG, lambda packet: self.on_data(packet.payload))
+
+    def on_header(self, payload: bytes) -> None:
+        """
+        Parses the log header and compiles the record layouts.
+
+        :param payload:
+        :return:
+        """
+        if self.header is not None:
+            return
+
+        self.header = parse_header(payload)
+        self.layouts = {
+            record_id: compile_layout(record_id, *record)
+            for record_id, record in RECORDS.items()
+        }
+
+    def on_data(self, payload: bytes, timestamp: float = None) -> None:
+        """
+        Appends the records of a LOG_DATA_MSG payload.
+
+        :param payload:
+        :param timestamp:
+        :return:
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        layouts, chunks = self.layouts, self._chunks
+
+        for record_id, data in iter_records(payload):
+            layout = layouts.get(record_id)
+
+            if layout is None or len(data) < layout.struct.size:
+                self.unknown += 1
+                continue
+
+            chunk = chunks.get(record_id)
+            if chunk is None:
+                chunk = chunks[record_id] = ChunkBuffer(layout)
+
+            chunk.append(timestamp, data)
+
+            if chunk.count >= self._chunk_rows:
+                self._queue.put(chunk)
+                chunks[record_id] = ChunkBuffer(layout)
+
+    def _write(self) -> None:
+        """
+        Worker thread body, compresses and writes the chunks.
+
+        :return:
+        """
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+
+            data = zlib.compress(to_columns(chunk), self._compression)
+            offset = self._file.tell()
+
+            self._file.write(CHUNK.pack(chunk.layout.record_id, chunk.count, len(data)))
+            self._file.write(data)
+            self._index.append((offset, chunk.layout.record_id, chunk.count, len(data)))
+
+    def close(self) -> None:
+        """
+        Flushes pending chunks and writes the index.
+
+        :return:
+        """
+        for chunk in self._chunks.values():
+            if chunk.count:
+                self._queue.put(chunk)
+
+        self._chunks.clear()
+        self._queue.put(None)
+        self._writer.join()
+
+        index = {
+            'header': self.header._asdict() if self.header else None,
+            'layouts': {
+                layout.name: {
+                    'id': layout.record_id,
+                    'fields': layout.fields,
+                    'typecodes': layout.typecodes,
+                }
+                for layout in self.layouts.values()
+            },
+            'chunks': self._index,
+        }
+
+        offset = self._file.tell()
+        self._file.write(json.dumps(index).encode())
+        self._file.write(TRAILER.pack(offset, MAGIC))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class FlightLogReader(object):
+
+    def __init__(self, path: str):
+        """
+        Reads a finished flight log. The file is memory mapped, only
+        the chunks of the requested record types are decompressed.
+
+        :param path:
+        """
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        offset, magic = TRAILER.unpack_from(self._mmap, len(self._mmap) - TRAILER.size)
+
+        if self._mmap[:len(MAGIC)] != MAGIC or magic != MAGIC:
+            raise ValueError("Not a flight log.")
+
+        index = json.loads(bytes(self._mmap[offset:len(self._mmap) - TRAILER.size]))
+
+        self.header = LogHeader(**index['header']) if index['header'] else None
+        self.layouts = index['layouts']
+        self._chunks = index['chunks']
+
+    @property
+    def records(self) -> List[str]:
+        return list(self.layouts)
+
+    def columns(self, name: str) -> Dict[str, array]:
+        """
+        Returns every column of a record type, timestamps included.
+
+        :param name:
+        :return:
+        """
+        layout = self.layouts[name]
+        fields = ['timestamp'] + list(layout['fields'])
+        typecodes = 'd' + layout['typecodes']
+        columns = {field: array(code) for field, code in zip(fields, typecodes)}
+
+        view = memoryview(self._mmap)
+
+        try:
+            for offset, record_id, rows, size in self._chunks:
+                if record_id != layout['id']:
+                    continue
+
+                start = offset + CHUNK.size
+                data = zlib.decompress(view[start:start + size])
+                pos = 0
+
+                for field, code in zip(fields, typecodes):
+                    column = columns[field]
+                    end = pos + rows * column.itemsize
+                    column.frombytes(data[pos:end])
+                    pos = end
+        finally:
+            view.release()
+
+        return columns
+
+    def column(self, name: str, field: str) -> array:
+        """
+        Returns a single column of a record type.
+
+        :param name:
+        :param field:
+        :return:
+        """
+        return self.columns(name)[field]
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
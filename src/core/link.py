@@ -0,0 +1,215 @@
+import asyncio
+import collections
+from typing import Callable, DefaultDict, List, Tuple
+
+from config.settings import DRONE_ADDRESS, LOCAL_PORT, VIDEO_PORT
+
+from .capture import RECEIVED, SENT
+from .metrics import registry
+from .packet import CRCError, Packet, PacketError, STICK
+from .scheduler import LaneScheduler
+
+
+Handler = Callable[[Packet], None]
+
+# Unanswered commands remembered per command id.
+MAX_INFLIGHT = 16
+
+
+class Link(asyncio.DatagramProtocol):
+
+    def __init__(self, scheduler: LaneScheduler = None, *,
+                 address: Tuple[str, int] = DRONE_ADDRESS,
+                 loop: asyncio.AbstractEventLoop = None):
+        """
+        UDP link with the drone. Outbound packets are taken from the
+        lane scheduler by priority, inbound packets are decoded and
+        dispatched to the handlers subscribed to their command.
+
+        :param scheduler:
+        :param address:
+        :param loop:
+        """
+        if loop is None:
+            self._loop = asyncio.get_event_loop()
+        else:
+            self._loop = loop
+
+        self.address = address
+        self.scheduler = scheduler or LaneScheduler(loop=self._loop)
+        self.transport: asyncio.DatagramTransport = None
+        self.connected = asyncio.Event()
+        self.task_send: asyncio.Task = None
+
+        # Set by LinkCapture.attach, records every datagram.
+        self.capture = None
+
+        self._handlers: DefaultDict[int, List[Handler]] = collections.defaultdict(list)
+        self._sequence = 0
+
+        # Send time of the commands waiting for their response, by
+        # command id and sequence number, oldest first. Used to measure
+        # the round trip time and to spot overdue answers.
+        self._inflight: DefaultDict[int, 'collections.OrderedDict[int, float]'] = \
+            collections.defaultdict(collections.OrderedDict)
+
+        self.sent = registry.counter('link_packets_sent_total', 'Packets sent')
+        self.received = registry.counter('link_packets_received_total', 'Packets received')
+        self.crc_errors = registry.counter('link_crc_errors_total', 'Packets with a bad checksum')
+        self.rtt = registry.gauge('link_rtt_seconds', 'Last command round trip time')
+
+        for lane in self.scheduler.lanes:
+            labels = {'lane': lane.name}
+            registry.gauge('scheduler_queued_packets', 'Packets waiting to be sent',
+                           labels, function=lane.__len__)
+            registry.gauge('scheduler_max_delay_seconds', 'Maximum queueing delay',
+                           labels, function=lambda lane=lane: lane.max_delay)
+
+    def subscribe(self, cmd: int, handler: Handler) -> None:
+        """
+        Calls handler for every received packet of a command.
+
+        :param cmd:
+        :param handler:
+        :return:
+        """
+        self._handlers[cmd].append(handler)
+
+    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
+        self.transport = transport
+
+    def connection_lost(self, exc: Exception) -> None:
+        self.connected.clear()
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        """
+        Decodes a packet and dispatches it.
+
+        :param data:
+        :param addr:
+        :return:
+        """
+        if self.capture is not None:
+            self.capture.record(RECEIVED, data)
+
+        if data.startswith(b'conn_ack'):
+            self.connected.set()
+            return
+
+        try:
+            packet = Packet.decode(data)
+        except CRCError:
+            self.crc_errors.value += 1
+            return
+        except PacketError:
+            return
+
+        self.received.value += 1
+
+        pending = self._inflight.get(packet.cmd)
+        sent = pending.pop(packet.seq, None) if pending else None
+
+        if sent is not None:
+            self.rtt.value = self._loop.time() - sent
+
+            # Older requests of the same command won't be answered.
+            while pending and next(iter(pending.values())) < sent:
+                pending.popitem(last=False)
+
+        for handler in self._handlers.get(packet.cmd, ()):
+            handler(packet)
+
+    def overdue(self, cmd: int) -> float:
+        """
+        Time the oldest unanswered request of a command has been
+        waiting, zero if every request was answered.
+
+        :param cmd:
+        :return:
+        """
+        pending = self._inflight.get(cmd)
+        if not pending:
+            return 0.
+
+        return self._loop.time() - next(iter(pending.values()))
+
+    def send(self, packet: Packet) -> None:
+        """
+        Sends a packet right away, bypassing the scheduler. Sticks
+        are always sent with sequence number zero.
+
+        :param packet:
+        :return:
+        """
+        if packet.pkt_type == STICK:
+            seq = 0
+        else:
+            self._sequence = seq = (self._sequence + 1) & 0xffff
+
+            pending = self._inflight[packet.cmd]
+            pending[seq] = self._loop.time()
+            if len(pending) > MAX_INFLIGHT:
+                pending.popitem(last=False)
+
+        data = packet.encode(seq)
+        self.transport.sendto(data)
+        self.sent.value += 1
+
+        if self.capture is not None:
+            self.capture.record(SENT, data)
+
+    async def on_send(self) -> None:
+        """
+        Sends the scheduled packets.
+
+        :return:
+        """
+        get, send = self.scheduler.get, self.send
+
+        while True:
+            send(await get())
+
+    async def connect(self, video_port: int = VIDEO_PORT) -> None:
+        """
+        Opens the socket and performs the connection handshake with
+        the drone, which also sets the video port.
+
+        :param video_port:
+        :return:
+        """
+        await self._loop.create_datagram_endpoint(
+            lambda: self, local_addr=('0.0.0.0', LOCAL_PORT),
+            remote_addr=self.address)
+
+        request = b'conn_req:' + video_port.to_bytes(2, 'little')
+        self.transport.sendto(request)
+
+        if self.capture is not None:
+            self.capture.record(SENT, request)
+        await self.connected.wait()
+
+    async def start(self) -> None:
+        """
+        Connects and starts sending the scheduled packets.
+
+        :return:
+        """
+        await self.connect()
+        self.task_send = self._loop.create_task(self.on_send())
+
+    async def stop(self) -> None:
+        """
+        Stops sending and closes the socket.
+
+        :return:
+        """
+        if self.task_send is not None:
+            self.task_send.cancel()
+
+            try:
+                await self.task_send
+            except asyncio.CancelledError:
+                pass
+
+        if self.transport is not None:
+            self.transport.close()
@@ -0,0 +1,227 @@
+import asyncio
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Metric(object):
+    __slots__ = ('name', 'help', 'labels', 'value')
+
+    kind: str = 'untyped'
+
+    def __init__(self, name: str, help: str = '', labels: Labels = ()):
+        """
+        Single metric. Hot paths keep a reference to the metric and
+        update its value attribute directly, e.g.
+
+            self._events_read.value += 1
+
+        Updates happen in the loop thread, or are single bytecode
+        additions otherwise, so no locking is involved.
+
+        :param name:
+        :param help:
+        :param labels:
+        """
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.value = 0
+
+    def sample(self) -> Union[int, float]:
+        return self.value
+
+
+class Counter(Metric):
+    __slots__ = ()
+
+    kind = 'counter'
+
+    def inc(self, amount: Union[int, float] = 1) -> None:
+        self.value += amount
+
+
+class Gauge(Metric):
+    __slots__ = ('function',)
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, help: str = '', labels: Labels = (),
+                 function: Callable[[], Union[int, float]] = None):
+        """
+        Metric that can go up and down. If a function is given the
+        value is only computed when the metrics are collected, which
+        suits things like queue sizes.
+
+        :param name:
+        :param help:
+        :param labels:
+        :param function:
+        """
+        super().__init__(name, help, labels)
+        self.function = function
+
+    def set(self, value: Union[int, float]) -> None:
+        self.value = value
+
+    def sample(self) -> Union[int, float]:
+        if self.function is not None:
+            return self.function()
+        return self.value
+
+
+class Registry(object):
+
+    def __init__(self):
+        """
+        Collection of metrics exported in the Prometheus text format.
+        """
+        self._metrics: Dict[Tuple[str, Labels], Metric] = {}
+
+    def _get_or_create(self, cls, name: str, help: str, labels: Dict[str, str],
+                       **kwargs) -> Metric:
+        key = (name, tuple(sorted((labels or {}).items())))
+        metric = self._metrics.get(key)
+
+        if metric is None:
+            metric = self._metrics[key] = cls(name, help, key[1], **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError("Metric {} is already a {}.".format(name, metric.kind))
+
+        return metric
+
+    def counter(self, name: str, help: str = '', labels: Dict[str, str] = None) -> Counter:
+        """
+        Returns the counter with this name and labels, it's created
+        the first time.
+
+        :param name:
+        :param help:
+        :param labels:
+        :return:
+        """
+        return self._get_or_create(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str = '', labels: Dict[str, str] = None,
+              function: Callable[[], Union[int, float]] = None) -> Gauge:
+        """
+        Returns the gauge with this name and labels, it's created the
+        first time.
+
+        :param name:
+        :param help:
+        :param labels:
+        :param function:
+        :return:
+        """
+        gauge = self._get_or_create(Gauge, name, help, labels)
+        if function is not None:
+            gauge.function = function
+        return gauge
+
+    def unregister(self, *metrics: Metric) -> None:
+        """
+        Removes metrics, e.g. the ones of a closed device. Metrics
+        already replaced or removed are ignored.
+
+        :param metrics:
+        :return:
+        """
+        for metric in metrics:
+            key = (metric.name, metric.labels)
+            if self._metrics.get(key) is metric:
+                del self._metrics[key]
+
+    def render(self) -> str:
+        """
+        Metrics in the Prometheus text exposition format.
+
+        :return:
+        """
+        lines: List[str] = []
+        described = set()
+
+        for (name, labels), metric in sorted(self._metrics.items()):
+            if name not in described:
+                described.add(name)
+                if metric.help:
+                    lines.append('# HELP {} {}'.format(name, metric.help))
+                lines.append('# TYPE {} {}'.format(name, metric.kind))
+
+            if labels:
+                name += '{' + ','.join(
+                    '{}="{}"'.format(key, value) for key, value in labels) + '}'
+
+            lines.append('{} {}'.format(name, metric.sample()))
+
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+class MetricsExporter(object):
+
+    def __init__(self, address: str, registry: Registry = registry,
+                 loop: asyncio.AbstractEventLoop = None):
+        """
+        Minimal HTTP server publishing the metrics from the event loop.
+        The address is either 'host:port', a port, or 'unix:/path' to
+        listen on a Unix socket.
+
+        :param address:
+        :param registry:
+        :param loop:
+        """
+        if loop is None:
+            self._loop = asyncio.get_event_loop()
+        else:
+            self._loop = loop
+
+        self.address = address
+        self.registry = registry
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        """
+        Starts listening.
+
+        :return:
+        """
+        if self.address.startswith('unix:'):
+            self.server = await asyncio.start_unix_server(
+                self.on_request, self.address[len('unix:'):])
+        else:
+            host, _, port = self.address.rpartition(':')
+            self.server = await asyncio.start_server(
+                self.on_request, host or '127.0.0.1', int(port))
+
+    async def stop(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def on_request(self, reader: asyncio.StreamReader,
+                         writer: asyncio.StreamWriter) -> None:
+        """
+        Answers any request with the metrics, the request itself is
+        read until the end of its headers and ignored.
+
+        :param reader:
+        :param writer:
+        :return:
+        """
+        try:
+            while (await reader.readline()).strip():
+                pass
+
+            body = self.registry.render().encode()
+            writer.write(
+                b'HTTP/1.0 200 OK\r\n'
+                b'Content-Type: text/plain; version=0.0.4\r\n'
+                b'Content-Length: ' + str(len(body)).encode() + b'\r\n\r\n' + body)
+            await writer.drain()
+
+        finally:
+            writer.close()
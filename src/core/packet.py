@@ -0,0 +1,108 @@
+import datetime
+import struct
+from typing import NamedTuple
+
+from .crc import crc8, crc16
+from .protocol import START_OF_PACKET, STICK_CMD
+
+
+# start, size << 3, crc8, packet type, command, sequence
+HEADER = struct.Struct('<BHBBHH')
+CRC16 = struct.Struct('<H')
+OVERHEAD = HEADER.size + CRC16.size
+
+# Packet types
+COMMAND = 0x68
+SET = 0x48
+STICK = 0x60
+ACK = 0x50
+
+
+class PacketError(ValueError):
+    pass
+
+
+class CRCError(PacketError):
+    pass
+
+
+class Packet(NamedTuple):
+    """
+    Frame of the drone binary protocol.
+    """
+    cmd: int
+    payload: bytes = b''
+    pkt_type: int = COMMAND
+    seq: int = 0
+
+    def encode(self, seq: int = None) -> bytes:
+        """
+        Serializes the packet, optionally overriding its sequence
+        number.
+
+        :param seq:
+        :return:
+        """
+        size = len(self.payload) + OVERHEAD
+        buf = bytearray(size)
+
+        HEADER.pack_into(
+            buf, 0, START_OF_PACKET, size << 3, 0, self.pkt_type, self.cmd,
+            (self.seq if seq is None else seq) & 0xffff)
+        buf[3] = crc8(buf[:3])
+        buf[HEADER.size:-CRC16.size] = self.payload
+        CRC16.pack_into(buf, size - CRC16.size, crc16(buf[:-CRC16.size]))
+
+        return bytes(buf)
+
+    @classmethod
+    def decode(cls, data: bytes) -> 'Packet':
+        """
+        Parses and validates a frame.
+
+        :param data:
+        :return:
+        """
+        if len(data) < OVERHEAD or data[0] != START_OF_PACKET:
+            raise PacketError("Not a protocol frame.")
+
+        _, size, crc, pkt_type, cmd, seq = HEADER.unpack_from(data)
+
+        if size >> 3 != len(data):
+            raise PacketError("Frame size mismatch.")
+
+        if crc != crc8(data[:3]) or \
+                CRC16.unpack_from(data, len(data) - CRC16.size)[0] != crc16(data[:-CRC16.size]):
+            raise CRCError("Invalid checksum.")
+
+        return cls(cmd, bytes(data[HEADER.size:-CRC16.size]), pkt_type, seq)
+
+
+def stick_packet(roll: float = 0., pitch: float = 0., throttle: float = 0.,
+                 yaw: float = 0., fast: bool = False,
+                 now: datetime.datetime = None) -> Packet:
+    """
+    Builds a STICK_CMD packet. Every axis is in the [-1, 1] range and
+    is packed into 11 bits, followed by the local time.
+
+    :param roll:
+    :param pitch:
+    :param throttle:
+    :param yaw:
+    :param fast:
+    :param now:
+    :return:
+    """
+    packed = 0
+
+    for shift, value in enumerate((roll, pitch, throttle, yaw)):
+        value = max(-1., min(1., value))
+        packed |= (int(1024 + 660 * value) & 0x7ff) << (11 * shift)
+
+    packed |= int(fast) << 44
+    now = now or datetime.datetime.now()
+
+    payload = packed.to_bytes(6, 'little') + bytes((
+        now.hour, now.minute, now.second)) + (now.microsecond // 1000).to_bytes(2, 'little')
+
+    return Packet(STICK_CMD, payload, STICK)
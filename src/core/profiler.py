@@ -0,0 +1,210 @@
+import collections
+import sys
+import threading
+import time
+from types import CodeType, FrameType
+from typing import Callable, Counter, Dict, List, Optional, Tuple
+
+from config.settings import PROFILE_RATE
+
+
+# Pipeline stage of the code in every module, by module name prefix.
+# The innermost frame with a stage gives the stage of a sample.
+STAGES: Tuple[Tuple[str, str], ...] = (
+    ('devices.process', 'device read'),
+    ('devices.base', 'device read'),
+    ('devices.evdev', 'device read'),
+    ('devices.abstract', 'buffer'),
+    ('devices.filters', 'dispatch'),
+    ('devices.combos', 'dispatch'),
+    ('devices.controllers', 'dispatch'),
+    ('core.scheduler', 'dispatch'),
+    ('core.packet', 'encode'),
+    ('core.crc', 'encode'),
+    ('core.link', 'send'),
+    ('ui', 'ui'),
+    ('selectors', 'idle'),
+)
+
+# Stages set explicitly with the stage decorator.
+_stages: Dict[CodeType, str] = {}
+
+
+def stage(name: str) -> Callable:
+    """
+    Decorator that attributes the time spent in a function to a
+    pipeline stage, overriding the stage of its module.
+
+    :param name:
+    :return:
+    """
+    def decorator(func: Callable) -> Callable:
+        _stages[func.__code__] = name
+        return func
+
+    return decorator
+
+
+class SamplingProfiler(object):
+
+    def __init__(self, rate: float = PROFILE_RATE, thread_id: int = None,
+                 stages: Tuple[Tuple[str, str], ...] = STAGES):
+        """
+        Statistical profiler that samples the stack of a thread, the
+        event loop thread by default, from a background thread. Every
+        sample is attributed to a pipeline stage and the result is
+        written as folded stacks, the input format of flamegraph.pl
+        and speedscope, with the stage as the root frame.
+
+        The sampler needs the GIL for every sample, and a busy thread
+        only hands it over every switch interval (5 ms by default), so
+        the interval is lowered below the sampling period while
+        profiling. Otherwise the rate would collapse precisely during
+        the stalls worth finding.
+
+        :param rate: samples per second.
+        :param thread_id: thread to sample, the calling one by default.
+        :param stages: stage by module name prefix.
+        """
+        self.interval = 1 / rate
+        self.thread_id = thread_id or threading.get_ident()
+        self.samples: Counter[str] = collections.Counter()
+
+        self._stages = stages
+        self._codes: Dict[CodeType, Optional[str]] = {}
+        self._names: Dict[CodeType, str] = {}
+        self._running = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._switch_interval: Optional[float] = None
+
+    def _stage(self, frame: FrameType) -> Optional[str]:
+        """
+        Stage of the code of a frame, cached by code object.
+
+        :param frame:
+        :return:
+        """
+        code = frame.f_code
+
+        try:
+            return self._codes[code]
+        except KeyError:
+            pass
+
+        name = _stages.get(code)
+
+        if name is None:
+            module = frame.f_globals.get('__name__', '')
+            for prefix, value in self._stages:
+                if module == prefix or module.startswith(prefix + '.'):
+                    name = value
+                    break
+
+        self._codes[code] = name
+        return name
+
+    def _name(self, frame: FrameType) -> str:
+        code = frame.f_code
+
+        try:
+            return self._names[code]
+        except KeyError:
+            name = self._names[code] = '{}:{}'.format(
+                frame.f_globals.get('__name__', '?'), code.co_name)
+            return name
+
+    def sample(self) -> None:
+        """
+        Takes a single sample of the profiled thread.
+
+        :return:
+        """
+        frame = sys._current_frames().get(self.thread_id)
+        names: List[str] = []
+        stage_name = None
+
+        while frame is not None:
+            names.append(self._name(frame))
+            if stage_name is None:
+                stage_name = self._stage(frame)
+            frame = frame.f_back
+
+        if names:
+            names.append(stage_name or 'other')
+            self.samples[';'.join(reversed(names))] += 1
+
+    def _run(self) -> None:
+        interval, sample = self.interval, self.sample
+        deadline = time.perf_counter()
+
+        while self._running.is_set():
+            sample()
+
+            deadline += interval
+            delay = deadline - time.perf_counter()
+
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Too slow to keep up, skip the missed samples.
+                deadline = time.perf_counter()
+
+    def start(self) -> None:
+        """
+        Starts sampling.
+
+        :return:
+        """
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval / 4))
+
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops sampling.
+
+        :return:
+        """
+        self._running.clear()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        if self._switch_interval is not None:
+            sys.setswitchinterval(self._switch_interval)
+            self._switch_interval = None
+
+    def stages(self) -> Counter[str]:
+        """
+        Number of samples of every stage.
+
+        :return:
+        """
+        result: Counter[str] = collections.Counter()
+
+        for stack, count in self.samples.items():
+            result[stack.split(';', 1)[0]] += count
+
+        return result
+
+    def write(self, path: str) -> None:
+        """
+        Writes the samples as folded stacks.
+
+        :param path:
+        :return:
+        """
+        with open(path, 'w') as file:
+            for stack, count in sorted(self.samples.items()):
+                file.write('{} {}\n'.format(stack, count))
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
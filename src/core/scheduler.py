@@ -0,0 +1,279 @@
+import asyncio
+import collections
+import time
+from typing import Deque, Dict
+
+from .packet import Packet
+from .protocol import (
+    LAND_CMD, PALM_LAND_CMD, STICK_CMD, RYZE_CMD_FILE_SIZE, RYZE_CMD_FILE_DATA,
+    RYZE_CMD_FILE_COMPLETE, LOG_HEADER_MSG, LOG_DATA_MSG, LOG_CONFIG_MSG
+)
+
+
+# Lanes in strict priority order.
+SAFETY = 0
+CONTROL = 1
+STICK = 2
+BULK = 3
+
+LANE_NAMES = ('safety', 'control', 'stick', 'bulk')
+
+SAFETY_COMMANDS = frozenset({LAND_CMD, PALM_LAND_CMD})
+STICK_COMMANDS = frozenset({STICK_CMD})
+BULK_COMMANDS = frozenset({
+    RYZE_CMD_FILE_SIZE, RYZE_CMD_FILE_DATA, RYZE_CMD_FILE_COMPLETE,
+    LOG_HEADER_MSG, LOG_DATA_MSG, LOG_CONFIG_MSG,
+})
+
+
+def classify(packet: Packet) -> int:
+    """
+    Returns the lane of a packet.
+
+    :param packet:
+    :return:
+    """
+    if packet.cmd in SAFETY_COMMANDS:
+        return SAFETY
+    if packet.cmd in STICK_COMMANDS:
+        return STICK
+    if packet.cmd in BULK_COMMANDS:
+        return BULK
+    return CONTROL
+
+
+class Lane(object):
+    __slots__ = ('name', 'maxsize', 'items', 'count', 'dropped', 'delay', 'max_delay')
+
+    def __init__(self, name: str, maxsize: int = 0):
+        """
+        Queue of packets with the same priority. Every item keeps its
+        enqueue time so the queueing delay is measured on removal.
+
+        :param name:
+        :param maxsize:
+        """
+        self.name = name
+        self.maxsize = maxsize
+        self.items = collections.deque()
+
+        # Dequeued packets, dropped or superseded packets, and the
+        # total and maximum queueing delay in seconds.
+        self.count = 0
+        self.dropped = 0
+        self.delay = 0.
+        self.max_delay = 0.
+
+    def full(self) -> bool:
+        return 0 < self.maxsize <= len(self.items)
+
+    def append(self, packet: Packet) -> None:
+        self.items.append((time.monotonic(), packet))
+
+    def popleft(self) -> Packet:
+        enqueued, packet = self.items.popleft()
+        delay = time.monotonic() - enqueued
+
+        self.count += 1
+        self.delay += delay
+        if delay > self.max_delay:
+            self.max_delay = delay
+
+        return packet
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+class LatestLane(Lane):
+    __slots__ = ('pending',)
+
+    def __init__(self, name: str):
+        """
+        Lane that keeps only the newest packet of each command, a
+        stale stick position is worthless once a new one exists.
+
+        :param name:
+        """
+        super().__init__(name)
+        self.pending: Dict[int, Packet] = {}
+
+    def full(self) -> bool:
+        return False
+
+    def append(self, packet: Packet) -> None:
+        if packet.cmd in self.pending:
+            # Keep the position in the queue and its enqueue time, so
+            # the delay accounts for the time the command was waiting.
+            self.pending[packet.cmd] = packet
+            self.dropped += 1
+        else:
+            self.pending[packet.cmd] = packet
+            self.items.append((time.monotonic(), packet.cmd))
+
+    def popleft(self) -> Packet:
+        cmd = super().popleft()
+        return self.pending.pop(cmd)
+
+
+class LaneScheduler(object):
+
+    def __init__(self, *, bulk_size: int = 256,
+                 loop: asyncio.AbstractEventLoop = None):
+        """
+        Outbound packet scheduler with strict priority between lanes:
+        safety commands always go first, then the rest of commands,
+        then stick positions (latest value wins) and finally bulk
+        traffic like files and logs.
+
+        :param bulk_size: maximum number of bulk packets waiting.
+        :param loop:
+        """
+        if loop is None:
+            self._loop = asyncio.get_event_loop()
+        else:
+            self._loop = loop
+
+        self.lanes = (
+            Lane(LANE_NAMES[SAFETY]),
+            Lane(LANE_NAMES[CONTROL]),
+            LatestLane(LANE_NAMES[STICK]),
+            Lane(LANE_NAMES[BULK], bulk_size),
+        )
+
+        # Futures of the coroutines waiting for a packet or for room
+        # in a bounded lane, woken up one at a time like asyncio.Queue.
+        self._getters = collections.deque()
+        self._putters = collections.deque()
+
+    def qsize(self) -> int:
+        """
+        Number of packets waiting in all lanes.
+
+        :return:
+        """
+        return sum(len(lane) for lane in self.lanes)
+
+    def empty(self) -> bool:
+        return not any(self.lanes)
+
+    @staticmethod
+    def _wakeup_next(waiters: Deque[asyncio.Future]) -> None:
+        """
+        Wakes up the first waiter that hasn't been cancelled.
+
+        :param waiters:
+        :return:
+        """
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    def put_nowait(self, packet: Packet) -> None:
+        """
+        Enqueues a packet in its lane. Raises QueueFull if the lane
+        is bounded and full.
+
+        :param packet:
+        :return:
+        """
+        lane = self.lanes[classify(packet)]
+
+        if lane.full():
+            lane.dropped += 1
+            raise asyncio.QueueFull
+
+        lane.append(packet)
+        self._wakeup_next(self._getters)
+
+    async def put(self, packet: Packet) -> None:
+        """
+        Enqueues a packet waiting for room if its lane is full.
+
+        :param packet:
+        :return:
+        """
+        lane = self.lanes[classify(packet)]
+
+        while lane.full():
+            putter = self._loop.create_future()
+            self._putters.append(putter)
+
+            try:
+                await putter
+            except asyncio.CancelledError:
+                try:
+                    self._putters.remove(putter)
+                except ValueError:
+                    pass
+
+                # A wakeup received just before the cancellation goes
+                # to the next putter.
+                if not lane.full() and not putter.cancelled():
+                    self._wakeup_next(self._putters)
+                raise
+
+        self.put_nowait(packet)
+
+    def get_nowait(self) -> Packet:
+        """
+        Removes the packet with the highest priority. Raises
+        QueueEmpty if there are none.
+
+        :return:
+        """
+        for lane in self.lanes:
+            if lane:
+                packet = lane.popleft()
+
+                if lane.maxsize:
+                    self._wakeup_next(self._putters)
+
+                return packet
+
+        raise asyncio.QueueEmpty
+
+    async def get(self) -> Packet:
+        """
+        Waits for the packet with the highest priority.
+
+        :return:
+        """
+        while self.empty():
+            getter = self._loop.create_future()
+            self._getters.append(getter)
+
+            try:
+                await getter
+            except asyncio.CancelledError:
+                try:
+                    self._getters.remove(getter)
+                except ValueError:
+                    pass
+
+                # A wakeup received just before the cancellation goes
+                # to the next getter.
+                if not self.empty() and not getter.cancelled():
+                    self._wakeup_next(self._getters)
+                raise
+
+        return self.get_nowait()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Queueing metrics of every lane. Delays are in milliseconds.
+
+        :return:
+        """
+        return {
+            lane.name: {
+                'queued': len(lane),
+                'sent': lane.count,
+                'dropped': lane.dropped,
+                'mean_delay': lane.delay / lane.count * 1000 if lane.count else 0.,
+                'max_delay': lane.max_delay * 1000,
+            }
+            for lane in self.lanes
+        }
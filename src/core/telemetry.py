@@ -0,0 +1,90 @@
+import struct
+from typing import NamedTuple
+
+from .packet import Packet
+from .protocol import FLIGHT_MSG, WIFI_MSG
+
+
+# https://tellopilots.com/wiki/protocol/#FlightData
+FLIGHT = struct.Struct('<5hBBBhhBBBBBBB')
+WIFI = struct.Struct('<BB')
+STICK = struct.Struct('<Q')
+
+# Stick axes are packed in 11 bits around this center.
+STICK_CENTER = 1024
+STICK_RANGE = 660
+
+
+class FlightData(NamedTuple):
+    """
+    FLIGHT_MSG payload. Height is in decimeters and speeds in
+    decimeters per second.
+    """
+    height: int = 0
+    north_speed: int = 0
+    east_speed: int = 0
+    ground_speed: int = 0
+    fly_time: int = 0
+    state: int = 0
+    imu_calibration_state: int = 0
+    battery_percentage: int = 100
+    drone_battery_left: int = 0
+    drone_fly_time_left: int = 0
+    em_state: int = 0
+    fly_mode: int = 0
+    throw_fly_timer: int = 0
+    camera_state: int = 0
+    electrical_machinery_state: int = 0
+    front_state: int = 0
+    temperature_height: int = 0
+
+    @property
+    def flying(self) -> bool:
+        return bool(self.em_state & 0x1)
+
+    @classmethod
+    def decode(cls, payload: bytes) -> 'FlightData':
+        return cls(*FLIGHT.unpack_from(payload))
+
+    def encode(self) -> bytes:
+        return FLIGHT.pack(*self)
+
+    def packet(self) -> Packet:
+        return Packet(FLIGHT_MSG, self.encode())
+
+
+class WifiData(NamedTuple):
+    """
+    WIFI_MSG payload, signal strength in percent and interference.
+    """
+    strength: int = 100
+    disturb: int = 0
+
+    @classmethod
+    def decode(cls, payload: bytes) -> 'WifiData':
+        return cls(*WIFI.unpack_from(payload))
+
+    def encode(self) -> bytes:
+        return WIFI.pack(*self)
+
+    def packet(self) -> Packet:
+        return Packet(WIFI_MSG, self.encode())
+
+
+class Sticks(NamedTuple):
+    """
+    STICK_CMD payload, every axis in the [-1, 1] range.
+    """
+    roll: float
+    pitch: float
+    throttle: float
+    yaw: float
+    fast: bool
+
+    @classmethod
+    def decode(cls, payload: bytes) -> 'Sticks':
+        packed = STICK.unpack(payload[:6] + b'\x00\x00')[0]
+        axes = [((packed >> (11 * i)) & 0x7ff) for i in range(4)]
+
+        return cls(*((axis - STICK_CENTER) / STICK_RANGE for axis in axes),
+                   bool((packed >> 44) & 0x1))
@@ -0,0 +1,65 @@
+import asyncio
+from typing import Callable, Dict, Optional, Tuple
+
+from .metrics import registry
+
+
+class VideoReceiver(asyncio.DatagramProtocol):
+
+    def __init__(self, callback: Callable[[bytes], None] = None):
+        """
+        Reassembles the video stream. The first byte of every packet
+        is the frame number and the second one the packet index in the
+        frame, with the high bit set in the last one. Frames skipped
+        or left incomplete are counted as lost.
+
+        :param callback: called with every complete frame.
+        """
+        self.callback = callback
+        self.transport: asyncio.DatagramTransport = None
+
+        self.frames = registry.counter('video_frames_total', 'Video frames received')
+        self.lost = registry.counter('video_frames_lost_total', 'Video frames lost')
+
+        self._number: Optional[int] = None
+        self._parts: Dict[int, bytes] = {}
+        self._last: Optional[int] = None
+        self._complete = False
+
+    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        if len(data) < 2:
+            return
+
+        number, index = data[0], data[1]
+
+        if number != self._number:
+            if self._number is not None:
+                skipped = (number - self._number) & 0xff
+
+                # A late packet of an older frame.
+                if skipped > 0x80:
+                    return
+
+                self.lost.value += skipped - 1 + (not self._complete)
+
+            self._number = number
+            self._parts = {}
+            self._last = None
+            self._complete = False
+
+        if self._complete:
+            return
+
+        self._parts[index & 0x7f] = data[2:]
+        if index & 0x80:
+            self._last = index & 0x7f
+
+        if self._last is not None and len(self._parts) == self._last + 1:
+            self._complete = True
+            self.frames.value += 1
+
+            if self.callback is not None:
+                self.callback(b''.join(self._parts[i] for i in range(self._last + 1)))
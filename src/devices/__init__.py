@@ -1 +1,17 @@
-from .devices import GamePad, Mouse, Keyboard
+__all__ = ('GamePad', 'Mouse', 'Keyboard')
+
+
+def __getattr__(name: str):
+    """
+    Device classes are resolved on first access (PEP 562). Importing
+    them pulls in the 'inputs' package, which enumerates every input
+    device at import time, so light subcommands must not pay for it.
+
+    :param name:
+    :return:
+    """
+    if name in __all__:
+        from . import devices
+        return getattr(devices, name)
+
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -1,20 +1,13 @@
 import abc
 import asyncio
 import time
-from typing import List
+from typing import Dict, List
 
-from inputs import convert_timeval, InputEvent, InputDevice
+from inputs import InputDevice
 
+from core.metrics import registry
 
-def time_elapsed(timestamp: float) -> float:
-    """
-    Time elapsed since timestamp.
-
-    :param timestamp:
-    :return:
-    """
-    secs, msecs = convert_timeval(time.time())
-    return secs + (msecs / 1000000) - timestamp
+from .evdev import RawEvent
 
 
 class BufferMixin:
@@ -28,7 +21,16 @@ class BufferMixin:
         """
         return self._buffer.qsize()
 
-    async def get(self) -> InputEvent:
+    def oldest(self) -> int:
+        """
+        Timestamp, in the clock of the device, of the oldest event
+        that has not exceeded the time limit.
+
+        :return:
+        """
+        return time.clock_gettime_ns(self.clock_id) - self._max_age
+
+    async def get(self) -> RawEvent:
         """
         Returns the next device event from buffer that has not
         exceeded the time limit.
@@ -37,7 +39,10 @@ class BufferMixin:
         """
         try:
             event = self._buffer.get_nowait()
-            while time_elapsed(event.timestamp) > self._timeout / 100:
+            oldest = self.oldest()
+
+            while event.timestamp < oldest:
+                self._events_expired.value += 1
                 event = self._buffer.get_nowait()
 
         except asyncio.QueueEmpty:
@@ -45,7 +50,28 @@ class BufferMixin:
 
         return event
 
-    async def put(self, event: InputEvent) -> None:
+    async def get_all(self) -> List[RawEvent]:
+        """
+        Returns every buffered event that has not exceeded the time
+        limit, waiting for one if the buffer is empty. Handling the
+        whole backlog at once keeps a button press from waiting behind
+        the axis events queued before it.
+
+        :return:
+        """
+        events = [await self.get()]
+        oldest = self.oldest()
+
+        while not self._buffer.empty():
+            event = self._buffer.get_nowait()
+            if event.timestamp >= oldest:
+                events.append(event)
+            else:
+                self._events_expired.value += 1
+
+        return events
+
+    async def put(self, event: RawEvent) -> None:
         """
         Insert an event in the buffer with a timeout. If the
         timeout is exceeded the insertion task is canceled.
@@ -53,10 +79,27 @@ class BufferMixin:
         :param event:
         :return:
         """
+        self._events_read.value += 1
+
         try:
             await asyncio.wait_for(self._buffer.put(event), timeout=self._timeout)
         except asyncio.TimeoutError:
-            pass
+            self._put_timeouts.value += 1
+
+    def put_nowait(self, event: RawEvent) -> None:
+        """
+        Insert an event in the buffer, the event is lost if the
+        buffer is full.
+
+        :param event:
+        :return:
+        """
+        self._events_read.value += 1
+
+        try:
+            self._buffer.put_nowait(event)
+        except asyncio.QueueFull:
+            self._put_timeouts.value += 1
 
 
 class AbstractDevice(abc.ABC, BufferMixin):
@@ -67,6 +110,7 @@ class AbstractDevice(abc.ABC, BufferMixin):
         :param maxsize:
         :param timeout:
         :param loop:
+        :param device:
         """
         if loop is None:
             self._loop = asyncio.get_event_loop()
@@ -77,6 +121,47 @@ class AbstractDevice(abc.ABC, BufferMixin):
         self._buffer_max_size = maxsize
         self._timeout = timeout
 
+        # Events older than timeout / 100 seconds are discarded. The
+        # kernel timestamps events with the real time clock unless the
+        # device asks for another one.
+        self._max_age = timeout * 10000000
+        self.clock_id = time.CLOCK_REALTIME
+
+        self.labels = self.metric_labels(device)
+        self._events_read = registry.counter(
+            'device_events_read_total', 'Events read from the device', self.labels)
+        self._events_expired = registry.counter(
+            'device_events_expired_total', 'Events discarded by age', self.labels)
+        self._put_timeouts = registry.counter(
+            'device_put_timeouts_total', 'Events lost with a full buffer', self.labels)
+        self._metrics = [
+            self._events_read, self._events_expired, self._put_timeouts,
+            registry.gauge('device_buffer_events', 'Events waiting in the buffer',
+                           self.labels, function=self._buffer.qsize)]
+
+    def metric_labels(self, device) -> Dict[str, str]:
+        """
+        Labels of the device metrics: the device class and the path
+        of the device, so every device gets its own metrics.
+
+        :param device:
+        :return:
+        """
+        path = getattr(device, '_device_path', None)
+        if path is None and device is not None:
+            path = device.get_char_device_path()
+
+        return {'device': type(self).__name__, 'path': path or '{:#x}'.format(id(self))}
+
+    def unregister(self) -> None:
+        """
+        Removes the device metrics from the registry, which would
+        otherwise keep the buffer of a closed device alive.
+
+        :return:
+        """
+        registry.unregister(*self._metrics)
+
     @abc.abstractmethod
     def devices(self) -> List[InputDevice]:
         """
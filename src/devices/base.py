@@ -1,12 +1,22 @@
 import asyncio
 import select
-from typing import List, Generator, AsyncIterable, Type
+from typing import (
+    AsyncIterable, AsyncIterator, Dict, Iterable, List, Iterator, Mapping, Optional,
+    Type
+)
 from pprint import pprint
 import os
 
-from inputs import InputDevice, InputEvent, devices, UnpluggedError
+from inputs import InputDevice, devices, UnpluggedError
 
+from config.settings import RESTART_DELAY
+from core.metrics import registry
 from .abstract import AbstractDevice
+from .state import DeviceState
+from .evdev import (
+    CODE_COUNT, EV_ABS, EV_SYN, READ_SIZE, FrameAssembler, InputFrame, RawEvent, State,
+    abs_values, decode, grab, pressed_keys, set_clock, set_mask, supported
+)
 
 
 def display_devices() -> None:
@@ -74,20 +84,28 @@ class BaseDevice(AbstractDevice):
         :param timeout:
         :param loop:
         """
-        super().__init__()
+        super().__init__(maxsize=maxsize, timeout=timeout, loop=loop, device=device)
 
         self._device = device
-        path: str = self._device.get_char_device_path()
 
-        try:
-            # Certain operations are possible only when the device is opened in
-            # read-write mode.
-            self.fd = os.open(path, os.O_RDWR | os.O_NONBLOCK)
-        except OSError:
-            self.fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+        # Kernel side filtering, applied again whenever the device
+        # is opened.
+        self.events: Optional[Mapping[int, Iterable[int]]] = None
+        self.masked: Dict[int, List[int]] = {}
+        self.exclusive = False
+
+        self.state = DeviceState(self.read_state)
+        self.fd = self.open()
 
         self.task_read: asyncio.Task = None
         self.reading = asyncio.Event()
+        self.hotplug = None
+
+        # Number of times the reader was restarted.
+        self.restarts = 0
+        self._restarts = registry.counter(
+            'device_restarts_total', 'Reader restarts after an unplug', self.labels)
+        self._metrics.append(self._restarts)
 
     @property
     def devices(self) -> List[InputDevice]:
@@ -98,86 +116,317 @@ class BaseDevice(AbstractDevice):
         """
         return devices
 
-    def read(self) -> Generator[InputEvent, None, None]:
+    def open(self) -> int:
         """
-        Read multiple input events from device. Return a generator object that
-        yields :class:`InputEvent <evdev.events.InputEvent>` instances. Raises
-        `BlockingIOError` if there are no available events at the moment.
+        Opens the character device in non blocking mode and returns
+        its file descriptor. Events are timestamped with the monotonic
+        clock when the kernel allows it.
 
         :return:
         """
-        events = self._device.read()
+        path: str = self.char_device_path()
+
+        try:
+            # Certain operations are possible only when the device is opened in
+            # read-write mode.
+            fd = os.open(path, os.O_RDWR | os.O_NONBLOCK)
+        except OSError:
+            fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+
+        self.clock_id = set_clock(fd)
+        self._filter(fd)
+        return fd
 
-        for event in events:
-            yield event
+    def mask(self, events: Optional[Mapping[int, Iterable[int]]]) -> bool:
+        """
+        Restricts the events the kernel delivers to the codes used
+        by the active mapping, the rest (MSC_SCAN, LEDs, unused axes)
+        never wake up the loop. Pass None to receive every event.
+        Returns False if the kernel can't filter the events.
+
+        :param events: codes by event type.
+        :return:
+        """
+        self.events = events
+        return self._filter(self.fd)
+
+    def grab(self, exclusive: bool = True) -> bool:
+        """
+        Takes an exclusive grab of the device, while flying its events
+        are not delivered to the desktop. Returns False if the device
+        can't be grabbed.
+
+        :param exclusive:
+        :return:
+        """
+        self.exclusive = exclusive
+        return grab(self.fd, exclusive)
+
+    def _filter(self, fd: int) -> bool:
+        """
+        Applies the event mask and the grab to an open device and
+        records the codes the kernel drops in 'self.masked'.
+
+        :param fd:
+        :return:
+        """
+        if self.exclusive:
+            grab(fd)
+
+        # Nothing to apply or to undo, devices deliver every event
+        # until they are told otherwise.
+        events = self.events
+        if events is None and not self.masked:
+            return True
+
+        if events is None:
+            events = {type_: range(CODE_COUNT.get(type_, 0))
+                      for type_ in range(CODE_COUNT[EV_SYN])}
+
+        self.masked = {}
+        if not set_mask(fd, events):
+            return False
+
+        for type_ in supported(fd, EV_SYN):
+            if type_ == EV_SYN or type_ not in CODE_COUNT:
+                continue
+
+            wanted = set(events.get(type_, ()))
+            masked = [code for code in supported(fd, type_) if code not in wanted]
+            if masked:
+                self.masked[type_] = masked
+
+        return True
+
+    def close(self) -> None:
+        """
+        Closes the device for good and removes its metrics, it's safe
+        to call it twice.
+
+        :return:
+        """
+        self.release()
+        self.unregister()
+
+    def release(self) -> None:
+        """
+        Closes the character device, it can be opened again. It's safe
+        to call it twice.
+
+        :return:
+        """
+        if self.fd is None:
+            return
+
+        self._loop.remove_reader(self.fd)
+        os.close(self.fd)
+        self.fd = None
+
+    def char_device_path(self) -> str:
+        """
+        Returns the path of the character device. The persistent
+        symlink is resolved again because a replugged device can
+        get a different event node.
+
+        :return:
+        """
+        path = getattr(self._device, '_device_path', None)
+
+        if path and os.path.islink(path):
+            return os.path.realpath(path)
+
+        return self._device.get_char_device_path()
+
+    def read(self) -> Iterator[RawEvent]:
+        """
+        Read multiple input events from device. Return an iterator that
+        yields :class:`RawEvent <devices.evdev.RawEvent>` instances. Raises
+        `BlockingIOError` if there are no available events at the moment
+        and `UnpluggedError` once the device is gone.
+
+        :return:
+        """
+        try:
+            data = os.read(self.fd, READ_SIZE)
+        except BlockingIOError:
+            raise
+        except OSError as error:
+            raise UnpluggedError("Device unplugged.") from error
+
+        if not data:
+            raise UnpluggedError("Device unplugged.")
+
+        return decode(data)
 
     def set_reader(self) -> asyncio.Future:
         """
         Asyncio coroutine to read multiple input events from device. Return
-        a generator object that yields :class:`InputEvent <evdev.events.InputEvent>`
+        an iterator that yields :class:`RawEvent <devices.evdev.RawEvent>`
         instances.
         """
-        future = asyncio.Future()
+        future = self._loop.create_future()
+        fd = self.fileno()
 
         def ready():
-            self._loop.remove_reader(self.fileno())
+            if future.done():
+                return
             try:
                 future.set_result(self.read())
             except Exception as error:
                 future.set_exception(error)
 
-        self._loop.add_reader(self.fileno(), ready)
+        self._loop.add_reader(fd, ready)
+        # Also unregisters the reader when the waiter is cancelled.
+        future.add_done_callback(lambda _: self._loop.remove_reader(fd))
 
         return future
 
-    def async_read(self) -> AsyncIterable[InputEvent]:
+    def async_read(self) -> AsyncIterable[RawEvent]:
         """
         Return an iterator that yields input events. This iterator is
         compatible with the ''async for'' syntax.
         """
         return ReadIterator(self)
 
+    def read_state(self) -> Optional[State]:
+        """
+        Reads the pressed keys and the absolute axis values from the
+        kernel, returns None if the device doesn't report them.
+
+        :return:
+        """
+        try:
+            return pressed_keys(self.fd), abs_values(self.fd, supported(self.fd, EV_ABS))
+        except OSError:
+            return None
+
+    async def frames(self) -> AsyncIterator[InputFrame]:
+        """
+        Yields one frame per hardware report with all the changes it
+        carries, so consumers wake up once per report instead of once
+        per event. After a SYN_DROPPED the device state is read again
+        and the next frame is a resync frame. Frames are read straight
+        from the device, don't combine it with 'start'.
+
+        :return:
+        """
+        assembler = FrameAssembler(self.read_state)
+        state = self.state
+
+        while True:
+            try:
+                events = await self.set_reader()
+            except BlockingIOError:
+                continue
+
+            for frame in assembler.feed(events):
+                state.apply(frame)
+                yield frame
+
+    def __aiter__(self) -> AsyncIterator[InputFrame]:
+        return self.frames()
+
     async def on_read(self) -> None:
         """
-        Read device events. This method waits 'self.reading'
-        event object we'll use to control the reading from
-        outside.
+        Moves device events into the buffer and the state snapshots.
+        It starts once 'self.reading' is set, then only wakes up when
+        the device is readable, and raises `UnpluggedError` once the
+        device is gone.
 
         :return:
         """
         await self.reading.wait()
-        device = await self.get_device()
+        state = self.state
+
+        while True:
+            try:
+                events = tuple(await self.set_reader())
+            except BlockingIOError:
+                continue
+
+            state.update(events)
 
-        # async for events in self.async_read():
-        #     for ev in events:
-        #         print("put event: ", ev)
-        #         await self.put(ev)
-        #         await asyncio.sleep(0)
+            # The pump never waits for the consumers: with a full buffer
+            # events are counted as lost, and the task can always be
+            # cancelled while it waits for the device.
+            put_nowait = self.put_nowait
+            for event in events:
+                put_nowait(event)
 
     async def start(self) -> None:
         """
-        Start the device reading task.
+        Supervises the reading task. When the device is unplugged
+        its file descriptor is closed and the device is opened again
+        as soon as a node shows up, or after a delay that doubles on
+        every failed attempt. Returns when the reading is stopped.
 
         :return:
         """
+        from .hotplug import HotplugWatcher
+
         self.reading.set()
-        self.task_read = self._loop.create_task(self.on_read())
+        self.hotplug = HotplugWatcher(loop=self._loop)
+        self.hotplug.open()
 
-        while True:
-            await asyncio.sleep(1)
+        minimum, maximum = RESTART_DELAY
+        delay = minimum
+
+        try:
+            while self.reading.is_set():
+                if self.fd is None:
+                    try:
+                        self.fd = self.open()
+                    except OSError:
+                        await self.hotplug.wait(delay)
+                        delay = min(delay * 2, maximum)
+                        continue
+
+                started = self._loop.time()
+                self.task_read = self._loop.create_task(self.on_read())
+
+                try:
+                    await self.task_read
+                except UnpluggedError:
+                    self.restarts += 1
+                    self._restarts.value += 1
+                    self.release()
+                except asyncio.CancelledError:
+                    if self.reading.is_set():
+                        raise
+                    break
+
+                # A reader that keeps failing right after opening must
+                # not spin, the delay is only reset after a healthy run.
+                if self._loop.time() - started > maximum:
+                    delay = minimum
+
+                await self.hotplug.wait(delay)
+                delay = min(delay * 2, maximum)
+        finally:
+            self.reading.clear()
+            self.hotplug.close()
+            self.close()
 
     async def stop(self) -> None:
         """
-        Stops the device reading task.
+        Stops the device reading task and wakes up the supervisor
+        if it's waiting for the device.
 
         :return:
         """
         self.reading.clear()
+
+        if self.hotplug is not None:
+            self.hotplug.notify()
+
+        if self.task_read is None:
+            return
+
         self.task_read.cancel()
 
         try:
             await self.task_read
-        except asyncio.CancelledError:
+        except (asyncio.CancelledError, UnpluggedError):
             pass
 
     async def get_device(self, index: int=0) -> InputDevice:
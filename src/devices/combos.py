@@ -0,0 +1,247 @@
+import asyncio
+import collections
+from typing import Any, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence
+
+from config.settings import COMBO_TIMEOUT
+
+from .config import SNES
+from .evdev import EV_KEY, RawEvent
+
+
+Action = Any
+
+
+class Combo(NamedTuple):
+    name: str
+    buttons: Sequence[str]
+    action: Action
+    hold: float = 0.
+
+
+class ComboRecognizer(object):
+
+    def __init__(self, callback: Callable[[Action], None], names: Sequence[str] = SNES, *,
+                 keymap: Mapping[int, str] = None, timeout: float = COMBO_TIMEOUT,
+                 loop: asyncio.AbstractEventLoop = None):
+        """
+        Recognizes button combos over the input stream. Chords (buttons
+        held together, optionally for some time) are looked up by the
+        bitmask of pressed buttons, and every sequence is compiled into
+        a single automaton (Aho-Corasick with a full transition table),
+        so handling an event costs the same whatever the number of
+        registered combos.
+
+        :param callback: called with the action of every recognized combo.
+        :param names: button names.
+        :param keymap: button name by EV_KEY code, used by feed().
+        :param timeout: maximum time between presses of a sequence.
+        :param loop:
+        """
+        if loop is None:
+            self._loop = asyncio.get_event_loop()
+        else:
+            self._loop = loop
+
+        self.callback = callback
+        self.timeout = timeout
+
+        self._bits = {name: 1 << i for i, name in enumerate(names)}
+        self._symbols = {name: i for i, name in enumerate(names)}
+        self._keymap = keymap or {}
+
+        self._chords: Dict[int, Combo] = {}
+        self._sequences: List[Combo] = []
+
+        # Sequence automaton: transitions by state and symbol, and the
+        # combos recognized when reaching every state.
+        self._goto: List[List[int]] = []
+        self._output: List[List[Combo]] = []
+        self._compiled = False
+
+        self.pressed = 0
+        self._state = 0
+        self._last_press = 0.
+        self._hold: Optional[asyncio.TimerHandle] = None
+
+    def mask(self, buttons: Iterable[str]) -> int:
+        """
+        Bitmask of a set of buttons.
+
+        :param buttons:
+        :return:
+        """
+        mask = 0
+        for button in buttons:
+            mask |= self._bits[button]
+        return mask
+
+    def chord(self, name: str, buttons: Iterable[str], action: Action,
+              hold: float = 0.) -> None:
+        """
+        Registers a combo triggered when exactly these buttons are
+        pressed together, for at least 'hold' seconds if given.
+
+        :param name:
+        :param buttons:
+        :param action:
+        :param hold:
+        :return:
+        """
+        buttons = tuple(buttons)
+        mask = self.mask(buttons)
+
+        if mask in self._chords:
+            raise ValueError("Chord {} already registered as {}.".format(
+                '+'.join(buttons), self._chords[mask].name))
+
+        self._chords[mask] = Combo(name, buttons, action, hold)
+
+    def sequence(self, name: str, buttons: Sequence[str], action: Action) -> None:
+        """
+        Registers a combo triggered when these buttons are pressed one
+        after the other.
+
+        :param name:
+        :param buttons:
+        :param action:
+        :return:
+        """
+        for button in buttons:
+            if button not in self._symbols:
+                raise KeyError(button)
+
+        self._sequences.append(Combo(name, tuple(buttons), action))
+        self._compiled = False
+
+    def compile(self) -> None:
+        """
+        Builds the sequence automaton.
+
+        :return:
+        """
+        symbols = len(self._symbols)
+        goto: List[List[int]] = [[0] * symbols]
+        output: List[List[Combo]] = [[]]
+
+        # Trie
+        for combo in self._sequences:
+            state = 0
+            for button in combo.buttons:
+                symbol = self._symbols[button]
+                if not goto[state][symbol]:
+                    goto.append([0] * symbols)
+                    output.append([])
+                    goto[state][symbol] = len(goto) - 1
+                state = goto[state][symbol]
+            output[state].append(combo)
+
+        # Failure links, breadth first, turning the trie into a full
+        # transition table.
+        fail = [0] * len(goto)
+        pending = collections.deque(s for s in goto[0] if s)
+
+        while pending:
+            state = pending.popleft()
+            output[state].extend(output[fail[state]])
+
+            for symbol, target in enumerate(goto[state]):
+                if target:
+                    fail[target] = goto[fail[state]][symbol]
+                    pending.append(target)
+                else:
+                    goto[state][symbol] = goto[fail[state]][symbol]
+
+        self._goto, self._output = goto, output
+        self._state = 0
+        self._compiled = True
+
+    def press(self, button: str, timestamp: float = None) -> None:
+        """
+        Handles a button press.
+
+        :param button:
+        :param timestamp:
+        :return:
+        """
+        if not self._compiled:
+            self.compile()
+
+        if timestamp is None:
+            timestamp = self._loop.time()
+
+        self.pressed |= self._bits[button]
+        self._on_chord()
+
+        if timestamp - self._last_press > self.timeout:
+            self._state = 0
+
+        self._last_press = timestamp
+        self._state = self._goto[self._state][self._symbols[button]]
+
+        for combo in self._output[self._state]:
+            self.callback(combo.action)
+
+    def release(self, button: str) -> None:
+        """
+        Handles a button release.
+
+        :param button:
+        :return:
+        """
+        self.pressed &= ~self._bits[button]
+        self._cancel_hold()
+
+    def feed(self, event: RawEvent) -> None:
+        """
+        Handles an input event, only EV_KEY events of mapped buttons
+        are taken into account. Autorepeat events are ignored.
+
+        :param event:
+        :return:
+        """
+        if event.type != EV_KEY:
+            return
+
+        button = self._keymap.get(event.code)
+
+        if button is None:
+            return
+
+        if event.value == 1:
+            self.press(button, event.timestamp / 1000000000)
+        elif event.value == 0:
+            self.release(button)
+
+    def _cancel_hold(self) -> None:
+        """
+        Cancels a pending hold, any change of the pressed buttons
+        interrupts it.
+
+        :return:
+        """
+        if self._hold is not None:
+            self._hold.cancel()
+            self._hold = None
+
+    def _on_chord(self) -> None:
+        """
+        Looks the pressed buttons up in the registered chords. Only
+        presses complete a chord, releasing a button never fires one.
+
+        :return:
+        """
+        self._cancel_hold()
+
+        combo = self._chords.get(self.pressed)
+
+        if combo is None:
+            return
+
+        if combo.hold:
+            self._hold = self._loop.call_later(combo.hold, self._on_hold, combo)
+        else:
+            self.callback(combo.action)
+
+    def _on_hold(self, combo: Combo) -> None:
+        self._hold = None
+        self.callback(combo.action)
@@ -1,15 +1,27 @@
 import sys
 from argparse import ArgumentParser
-from typing import Optional
-
-from inputs import devices, InputDevice
+from typing import Optional, TYPE_CHECKING
 
 from core.command import BaseCommandMixin, DEVICE_TEXT
-from config.settings import SCAN_TIMER_RANGE
-from devices.base import Device
-from devices.config import Config
+from config.settings import PROFILE_RATE, SCAN_TIMER_RANGE
 from .decorators import spin_animation
 
+if TYPE_CHECKING:
+    from inputs import DeviceManager, InputDevice
+    from devices.base import Device
+
+
+def device_manager() -> 'DeviceManager':
+    """
+    Returns the 'inputs' device manager. Importing the package
+    enumerates every device under /dev/input, so it's deferred
+    until a subcommand actually needs a device.
+
+    :return:
+    """
+    from inputs import devices
+    return devices
+
 
 class CommandMixin(BaseCommandMixin):
 
@@ -27,6 +39,37 @@ class CommandMixin(BaseCommandMixin):
             '--configure', action='store_true',
             help='Scan your devices establishing the first issuer as default')
 
+        parser.add_argument(
+            '--isolated', action='store_true',
+            help='Read device events in a dedicated process')
+
+        parser.add_argument(
+            '--joystick', action='store_true',
+            help='Use the mouse as a joystick')
+
+        parser.add_argument(
+            '--keyboard', action='store_true',
+            help='Use the keyboard as a joystick (WASD and arrows)')
+
+        parser.add_argument(
+            '--grab', action='store_true',
+            help='Take the device exclusively, its events do not reach the desktop')
+
+        parser.add_argument(
+            '--capture', metavar='FILE',
+            help='Fly the drone with the joystick and capture the link traffic to FILE')
+
+        parser.add_argument(
+            '--metrics', metavar='ADDRESS',
+            help='Serve runtime metrics on [host:]port or unix:path')
+
+        parser.add_argument(
+            '--profile', metavar='FILE',
+            help='Sample the event loop and write folded stacks to FILE on exit')
+        parser.add_argument(
+            '--profile-rate', metavar='HZ', type=float, default=PROFILE_RATE,
+            help='Profiler samples per second')
+
         self.add_arguments(parser)
 
     def __parse_arguments(self):
@@ -37,7 +80,12 @@ class CommandMixin(BaseCommandMixin):
         parser = self._create_parser()
         self.__add_arguments(parser)
 
-        return parser.parse_args(sys.argv[2:])
+        args = parser.parse_args(sys.argv[2:])
+
+        if args.capture and not (args.joystick or args.keyboard):
+            parser.error('--capture requires --joystick or --keyboard')
+
+        return args
 
     def __list(self, prefix: str = '') -> None:
         """
@@ -46,11 +94,11 @@ class CommandMixin(BaseCommandMixin):
         """
         stdout = getattr(self, 'stdout', sys.stdout)
 
-        for i, dev in enumerate(devices.all_devices):
+        for i, dev in enumerate(device_manager().all_devices):
             name = prefix + DEVICE_TEXT.format(i, dev.name)
             stdout.write(name)
 
-    def __select_device(self, msg: str) -> Optional[int]:
+    def __select_device(self, msg: str) -> Optional['InputDevice']:
         """
 
         :return:
@@ -63,25 +111,27 @@ class CommandMixin(BaseCommandMixin):
         return self.__device(index)
 
     @spin_animation(message="Scanning device...", frequency=.1)
-    def __scan(self, device: InputDevice = None) -> Device:
+    def __scan(self, device: 'InputDevice' = None) -> 'Device':
         """
 
         :return:
         """
+        from devices.config import Config
+
         self.__config = Config(device=device)
         self.__config.scan(*SCAN_TIMER_RANGE)
 
         return self.__config.device
 
     @staticmethod
-    def __device(index: int) -> Optional[InputDevice]:
+    def __device(index: int) -> Optional['InputDevice']:
         """
 
         :param index:
         :return:
         """
         try:
-            return devices.all_devices[index]
+            return device_manager().all_devices[index]
         except IndexError:
             pass
 
@@ -96,7 +146,7 @@ class CommandMixin(BaseCommandMixin):
             stdout = getattr(self, 'stdout', sys.stdout)
 
             # Try to detect the device in use
-            device: InputDevice = self.__scan()
+            device: 'InputDevice' = self.__scan()
 
             while not device:
                 stdout.write("\nSelect device:\n")
@@ -108,21 +158,103 @@ class CommandMixin(BaseCommandMixin):
             self.__list()
 
         else:
-            from devices import Mouse
-
-            device = devices.mice[0]
-            mouse = Mouse(loop=self._loop, device=device)
-
-            print("Initializing {}...".format(mouse))
+            if args.keyboard:
+                from devices import Keyboard as DeviceType
+                from devices.controllers import KeyboardStick as Stick
+                input_device = device_manager().keyboards[0]
+            else:
+                from devices import Mouse as DeviceType
+                from devices.controllers import MouseStick as Stick
+                input_device = device_manager().mice[0]
+
+            if args.isolated:
+                from devices.process import IsolatedDevice
+                device = IsolatedDevice(loop=self._loop, device=input_device)
+            else:
+                device = DeviceType(loop=self._loop, device=input_device)
+
+            print("Initializing {}...".format(device))
 
             async def read_device(device):
                 while True:
                     event = await device.get()
                     print("Event: {} {}".format(event, device.buffer_qsize))
 
-            self._loop.create_task(read_device(mouse))
-            self._loop.run_until_complete(mouse.start())
-            self._loop.close()
+            async def read_stick(device, scheduler):
+                stick = Stick(scheduler, loop=self._loop)
+                stick.start()
+
+                while True:
+                    stick.feed_batch(await device.get_all())
+                    print("Stick: {}".format(stick))
+
+            joystick = args.joystick or args.keyboard
+
+            if joystick:
+                device.mask(Stick.EVENTS)
+
+                # The reader process applies the mask when it starts.
+                if not args.isolated:
+                    print("Masked codes: {}".format(device.masked))
+
+            if args.grab:
+                device.grab()
+
+            link = capture = None
+
+            if args.capture:
+                from core.capture import LinkCapture
+                from core.link import Link
+
+                link = Link(loop=self._loop)
+                capture = LinkCapture(args.capture)
+                capture.attach(link)
+
+                print("Connecting to {}:{}...".format(*link.address))
+
+                try:
+                    self._loop.run_until_complete(link.start())
+                except BaseException:
+                    capture.close()
+                    raise
+
+            if joystick:
+                if link is not None:
+                    scheduler = link.scheduler
+                else:
+                    from core.scheduler import LaneScheduler
+                    scheduler = LaneScheduler(loop=self._loop)
+
+                self._loop.create_task(read_stick(device, scheduler))
+            else:
+                self._loop.create_task(read_device(device))
+
+            if args.metrics:
+                from core.metrics import MetricsExporter
+
+                exporter = MetricsExporter(args.metrics, loop=self._loop)
+                self._loop.run_until_complete(exporter.start())
+
+            profiler = None
+
+            if args.profile:
+                from core.profiler import SamplingProfiler
+
+                profiler = SamplingProfiler(rate=args.profile_rate)
+                profiler.start()
+
+            try:
+                self._loop.run_until_complete(device.start())
+            finally:
+                if profiler is not None:
+                    profiler.stop()
+                    profiler.write(args.profile)
+
+                if link is not None:
+                    self._loop.run_until_complete(link.stop())
+                    capture.close()
+
+                self._loop.close()
 
 
 
@@ -0,0 +1,242 @@
+import abc
+import asyncio
+import math
+from typing import Iterable, Mapping, Optional, Sequence, Tuple
+
+from config.settings import (
+    CONTROL_RATE, KEYBOARD_RAMP, KEYBOARD_RELEASE, MOUSE_STICK_GAIN, MOUSE_WHEEL_GAIN,
+    MOUSE_STICK_RELEASE
+)
+from core.packet import stick_packet
+from core.scheduler import LaneScheduler
+
+from .evdev import (
+    EV_KEY, EV_REL, KEY_A, KEY_D, KEY_DOWN, KEY_LEFT, KEY_RIGHT, KEY_S, KEY_UP, KEY_W,
+    REL_WHEEL, REL_X, REL_Y, RawEvent
+)
+from .state import KeyBitmap
+
+# Virtual axes driven by key pairs: (axis, negative key, positive key)
+KEYBOARD_AXES: Sequence[Tuple[str, int, int]] = (
+    ('roll', KEY_A, KEY_D),
+    ('pitch', KEY_S, KEY_W),
+    ('throttle', KEY_DOWN, KEY_UP),
+    ('yaw', KEY_LEFT, KEY_RIGHT),
+)
+
+
+def clamp(value: float) -> float:
+    return -1. if value < -1. else 1. if value > 1. else value
+
+
+class StickController(abc.ABC):
+
+    # Event codes used by the input mode, by event type, the device
+    # can drop everything else in the kernel. None uses every event.
+    EVENTS: Optional[Mapping[int, Iterable[int]]] = None
+
+    def __init__(self, scheduler: LaneScheduler = None, *, rate: float = CONTROL_RATE,
+                 loop: asyncio.AbstractEventLoop = None):
+        """
+        Base class of the input modes that drive the sticks. Events are
+        only accumulated as they arrive, the virtual axes are updated
+        once per control tick and sent to the stick lane.
+
+        :param scheduler: stick positions are discarded if not given.
+        :param rate: control ticks per second.
+        :param loop:
+        """
+        if loop is None:
+            self._loop = asyncio.get_event_loop()
+        else:
+            self._loop = loop
+
+        self.scheduler = scheduler
+        self.period = 1 / rate
+
+        self.roll = 0.
+        self.pitch = 0.
+        self.throttle = 0.
+        self.yaw = 0.
+
+        self.task_tick: Optional[asyncio.Task] = None
+
+    @abc.abstractmethod
+    def feed(self, event: RawEvent) -> None:
+        """
+        Accumulates an input event.
+
+        :param event:
+        :return:
+        """
+
+    def feed_batch(self, events: Iterable[RawEvent]) -> None:
+        """
+        Accumulates a batch of input events.
+
+        :param events:
+        :return:
+        """
+        feed = self.feed
+        for event in events:
+            feed(event)
+
+    @abc.abstractmethod
+    def tick(self) -> None:
+        """
+        Updates the virtual axes.
+
+        :return:
+        """
+
+    async def on_tick(self) -> None:
+        """
+        Runs a tick every period and sends the stick positions. Ticks
+        are scheduled from a fixed origin so they don't drift, the
+        origin is reset when a tick is late.
+
+        :return:
+        """
+        deadline = self._loop.time()
+
+        while True:
+            self.tick()
+
+            if self.scheduler is not None:
+                self.scheduler.put_nowait(stick_packet(
+                    self.roll, self.pitch, self.throttle, self.yaw))
+
+            deadline += self.period
+            delay = deadline - self._loop.time()
+
+            if delay < 0:
+                # Late after a stall, don't send a burst of ticks to
+                # catch up.
+                deadline = self._loop.time()
+                delay = 0
+
+            await asyncio.sleep(delay)
+
+    def start(self) -> None:
+        self.task_tick = self._loop.create_task(self.on_tick())
+
+    async def stop(self) -> None:
+        if self.task_tick is None:
+            return
+
+        self.task_tick.cancel()
+
+        try:
+            await self.task_tick
+        except asyncio.CancelledError:
+            pass
+
+    def __str__(self):
+        return '<{} roll={:+.2f} pitch={:+.2f} throttle={:+.2f} yaw={:+.2f}>'.format(
+            type(self).__name__, self.roll, self.pitch, self.throttle, self.yaw)
+
+
+class MouseStick(StickController):
+
+    EVENTS = {EV_REL: (REL_X, REL_Y, REL_WHEEL)}
+
+    def __init__(self, scheduler: LaneScheduler = None, *, rate: float = CONTROL_RATE,
+                 gain: float = MOUSE_STICK_GAIN, wheel_gain: float = MOUSE_WHEEL_GAIN,
+                 release: float = MOUSE_STICK_RELEASE,
+                 loop: asyncio.AbstractEventLoop = None):
+        """
+        Mouse as joystick: REL_X moves the roll axis, REL_Y the pitch
+        axis and the wheel the throttle. Roll and pitch spring back to
+        the center when the mouse stops moving.
+
+        :param scheduler:
+        :param rate: control ticks per second.
+        :param gain: stick travel per mouse count.
+        :param wheel_gain: throttle travel per wheel step.
+        :param release: spring-back time constant in seconds.
+        :param loop:
+        """
+        super().__init__(scheduler, rate=rate, loop=loop)
+
+        self.gain = gain
+        self.wheel_gain = wheel_gain
+        self.decay = math.exp(-self.period / release) if release else 0.
+
+        # Deltas accumulated since the last tick, by REL code.
+        self._deltas = [0] * (REL_WHEEL + 1)
+
+    def feed(self, event: RawEvent) -> None:
+        if event.type == EV_REL and event.code <= REL_WHEEL:
+            self._deltas[event.code] += event.value
+
+    def tick(self) -> None:
+        deltas, gain, decay = self._deltas, self.gain, self.decay
+
+        self.roll = clamp(self.roll * decay + deltas[REL_X] * gain)
+        # Screen coordinates grow downwards.
+        self.pitch = clamp(self.pitch * decay - deltas[REL_Y] * gain)
+        self.throttle = clamp(self.throttle + deltas[REL_WHEEL] * self.wheel_gain)
+
+        deltas[REL_X] = deltas[REL_Y] = deltas[REL_WHEEL] = 0
+
+
+class KeyboardStick(StickController):
+
+    EVENTS = {EV_KEY: tuple(key for _, negative, positive in KEYBOARD_AXES
+                            for key in (negative, positive))}
+
+    def __init__(self, scheduler: LaneScheduler = None, *, rate: float = CONTROL_RATE,
+                 axes: Sequence[Tuple[str, int, int]] = KEYBOARD_AXES,
+                 ramp: float = KEYBOARD_RAMP, release: float = KEYBOARD_RELEASE,
+                 loop: asyncio.AbstractEventLoop = None):
+        """
+        Keyboard as joystick: every axis is driven by a pair of keys,
+        WASD for roll and pitch and the arrows for throttle and yaw by
+        default. Events only update a key bitmap, so any number of held
+        keys and autorepeat storms cost a bit flip each; the axes ramp
+        towards the held direction once per tick, and back to the
+        center when released. Opposite keys held together cancel out.
+
+        :param scheduler:
+        :param rate: control ticks per second.
+        :param axes: (axis, negative key, positive key) tuples.
+        :param ramp: stick travel per second while a key is held.
+        :param release: stick travel per second back to the center.
+        :param loop:
+        """
+        super().__init__(scheduler, rate=rate, loop=loop)
+
+        self.axes = tuple(axes)
+        self.ramp = ramp * self.period
+        self.release = release * self.period
+        self.keys = KeyBitmap()
+
+        if axes is not KEYBOARD_AXES:
+            self.EVENTS = {EV_KEY: tuple(key for _, negative, positive in self.axes
+                                         for key in (negative, positive))}
+
+    def feed(self, event: RawEvent) -> None:
+        # Autorepeat (value 2) doesn't change the key state.
+        if event.type == EV_KEY and event.value != 2:
+            self.keys.set(event.code, event.value)
+
+    def feed_batch(self, events: Iterable[RawEvent]) -> None:
+        keys = self.keys
+
+        for _, type_, code, value in events:
+            if type_ == EV_KEY and value != 2:
+                keys.set(code, value)
+
+    def tick(self) -> None:
+        test = self.keys.test
+
+        for axis, negative, positive in self.axes:
+            target = test(positive) - test(negative)
+            value = getattr(self, axis)
+
+            if value < target:
+                value = min(value + (self.ramp if target > 0 else self.release), target)
+            elif value > target:
+                value = max(value - (self.ramp if target < 0 else self.release), target)
+
+            setattr(self, axis, value)
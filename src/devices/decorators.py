@@ -3,13 +3,13 @@ from functools import wraps
 import itertools
 import time
 import sys
-from typing import Callable, Tuple, Dict, Any, Optional
-import asyncio
+from typing import Callable, Tuple, Dict, Any, Optional, TYPE_CHECKING
 
-from inputs import InputDevice
+if TYPE_CHECKING:
+    from inputs import InputDevice
 
 
-Function = Callable[[Tuple[Any], Dict[str, Any]], InputDevice]
+Function = Callable[[Tuple[Any], Dict[str, Any]], 'InputDevice']
 
 
 class Signal:
@@ -29,7 +29,7 @@ class SpinDecorator(object):
         :param frequency:
         """
         self.signal = Signal()
-        self.device: Optional[InputDevice] = None
+        self.device: Optional['InputDevice'] = None
         self.msg = message
         self.freq = frequency
 
@@ -40,7 +40,8 @@ class SpinDecorator(object):
         :return:
         """
         @wraps(func)
-        def wrapper(*args, **kwargs) -> Optional[InputDevice]:
+        def wrapper(*args, **kwargs) -> Optional['InputDevice']:
+            import asyncio
 
             # TODO: asyncio version
             spinner = threading.Thread(
@@ -0,0 +1,396 @@
+import ctypes
+import fcntl
+import struct
+import time
+from typing import (
+    Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Set,
+    Tuple
+)
+
+
+# struct input_event {
+#     struct timeval time;
+#     __u16 type;
+#     __u16 code;
+#     __s32 value;
+# };
+EVENT_FORMAT = 'llHHi'
+EVENT = struct.Struct(EVENT_FORMAT)
+EVENT_SIZE = EVENT.size
+
+# Maximum number of bytes read from a device at once, 64 events.
+READ_SIZE = EVENT_SIZE * 64
+
+# ioctl request numbers, see include/uapi/asm-generic/ioctl.h
+def _IOC(direction: int, type_: str, nr: int, size: int) -> int:
+    return (direction << 30) | (size << 16) | (ord(type_) << 8) | nr
+
+
+def _IOW(type_: str, nr: int, size: int) -> int:
+    return _IOC(1, type_, nr, size)
+
+
+def _IOR(type_: str, nr: int, size: int) -> int:
+    return _IOC(2, type_, nr, size)
+
+
+def EVIOCGKEY(size: int) -> int:
+    return _IOR('E', 0x18, size)
+
+
+def EVIOCGBIT(type_: int, size: int) -> int:
+    return _IOR('E', 0x20 + type_, size)
+
+
+# struct input_absinfo {
+#     __s32 value;
+#     __s32 minimum;
+#     __s32 maximum;
+#     __s32 fuzz;
+#     __s32 flat;
+#     __s32 resolution;
+# };
+ABSINFO = struct.Struct('6i')
+
+
+def EVIOCGABS(code: int) -> int:
+    return _IOR('E', 0x40 + code, ABSINFO.size)
+
+
+# struct input_mask {
+#     __u32 type;
+#     __u32 codes_size;
+#     __u64 codes_ptr;
+# };
+INPUT_MASK = struct.Struct('IIQ')
+
+EVIOCGRAB = _IOW('E', 0x90, 4)
+EVIOCSMASK = _IOW('E', 0x93, INPUT_MASK.size)
+EVIOCSCLOCKID = _IOW('E', 0xa0, 4)
+
+# https://www.kernel.org/doc/html/latest/input/event-codes.html
+EV_SYN = 0x00
+EV_KEY = 0x01
+EV_REL = 0x02
+EV_ABS = 0x03
+EV_MSC = 0x04
+EV_LED = 0x11
+
+# Number of codes of each event type, the mask of EV_SYN holds
+# event types.
+CODE_COUNT: Dict[int, int] = {
+    EV_SYN: 0x20,
+    EV_KEY: 0x300,
+    EV_REL: 0x10,
+    EV_ABS: 0x40,
+    EV_MSC: 0x08,
+    EV_LED: 0x10,
+}
+
+SYN_REPORT = 0x00
+SYN_DROPPED = 0x03
+
+REL_X = 0x00
+REL_Y = 0x01
+REL_WHEEL = 0x08
+
+KEY_W = 17
+KEY_A = 30
+KEY_S = 31
+KEY_D = 32
+KEY_UP = 103
+KEY_LEFT = 105
+KEY_RIGHT = 106
+KEY_DOWN = 108
+
+ABS_X = 0x00
+ABS_Y = 0x01
+ABS_RX = 0x03
+ABS_RY = 0x04
+
+
+Change = Tuple[int, int, int]
+State = Tuple[Set[int], Dict[int, int]]
+
+
+class RawEvent(NamedTuple):
+    """
+    Decoded input event with numeric type and code, as the
+    kernel reports it. The timestamp is in nanoseconds, in the
+    clock of the device.
+    """
+    timestamp: int
+    type: int
+    code: int
+    value: int
+
+
+class InputFrame(NamedTuple):
+    """
+    Every (type, code, value) change of a hardware report, the
+    events between two SYN_REPORT. A resync frame carries the
+    changes found by reading the device state after the kernel
+    dropped events.
+    """
+    timestamp: int
+    changes: Tuple[Change, ...]
+    resync: bool = False
+
+
+def decode(buffer: bytes) -> Iterator[RawEvent]:
+    """
+    Decodes a buffer of 'struct input_event' records.
+
+    :param buffer:
+    :return:
+    """
+    for sec, usec, type_, code, value in EVENT.iter_unpack(buffer):
+        yield RawEvent(sec * 1000000000 + usec * 1000, type_, code, value)
+
+
+def encode(events: Iterable[Tuple[int, int, int]], timestamp: int) -> bytes:
+    """
+    Encodes (type, code, value) events as 'struct input_event'
+    records sharing a timestamp in nanoseconds.
+
+    :param events:
+    :param timestamp:
+    :return:
+    """
+    sec, usec = divmod(timestamp // 1000, 1000000)
+    pack = EVENT.pack
+
+    return b''.join(pack(sec, usec, type_, code, value) for type_, code, value in events)
+
+
+def set_clock(fd: int, clock_id: int = time.CLOCK_MONOTONIC) -> int:
+    """
+    Asks the kernel to timestamp the events of a device with a given
+    clock, by default the monotonic one so timestamps don't jump with
+    the wall clock. Returns the clock in use, CLOCK_REALTIME when the
+    device doesn't support the request.
+
+    :param fd:
+    :param clock_id:
+    :return:
+    """
+    try:
+        fcntl.ioctl(fd, EVIOCSCLOCKID, struct.pack('i', clock_id))
+    except OSError:
+        return time.CLOCK_REALTIME
+
+    return clock_id
+
+
+def _bitmap(codes: Iterable[int], count: int) -> bytearray:
+    """
+    Kernel bitmap with the bits of the given codes set.
+
+    :param codes:
+    :param count:
+    :return:
+    """
+    bitmap = bytearray((count + 7) // 8)
+
+    for code in codes:
+        bitmap[code >> 3] |= 1 << (code & 7)
+
+    return bitmap
+
+
+def supported(fd: int, type_: int) -> List[int]:
+    """
+    Returns the codes of a given type the device can emit, or the
+    event types for EV_SYN.
+
+    :param fd:
+    :param type_:
+    :return:
+    """
+    bitmap = bytearray((CODE_COUNT[type_] + 7) // 8)
+    fcntl.ioctl(fd, EVIOCGBIT(type_, len(bitmap)), bitmap)
+
+    return [code for code in range(CODE_COUNT[type_])
+            if bitmap[code >> 3] & (1 << (code & 7))]
+
+
+def set_mask(fd: int, events: Mapping[int, Iterable[int]]) -> bool:
+    """
+    Asks the kernel to deliver only the given codes of each event
+    type, events of other types are dropped too. SYN events are
+    always delivered. Returns False when the device doesn't support
+    masks (kernels older than 4.4).
+
+    :param fd:
+    :param events: codes by event type.
+    :return:
+    """
+    masks = {EV_SYN: set(events) | {EV_SYN}}
+    masks.update((type_, codes) for type_, codes in events.items()
+                 if type_ != EV_SYN and type_ in CODE_COUNT)
+
+    try:
+        for type_, codes in masks.items():
+            bitmap = (ctypes.c_ubyte * ((CODE_COUNT[type_] + 7) // 8)).from_buffer(
+                _bitmap(codes, CODE_COUNT[type_]))
+            fcntl.ioctl(fd, EVIOCSMASK, INPUT_MASK.pack(
+                type_, len(bitmap), ctypes.addressof(bitmap)))
+    except OSError:
+        return False
+
+    return True
+
+
+def grab(fd: int, exclusive: bool = True) -> bool:
+    """
+    Takes or releases an exclusive grab, while grabbed the events
+    of the device are not delivered to anyone else (the desktop
+    included). Returns False if the grab isn't possible.
+
+    :param fd:
+    :param exclusive:
+    :return:
+    """
+    try:
+        fcntl.ioctl(fd, EVIOCGRAB, int(exclusive))
+    except OSError:
+        return False
+
+    return True
+
+
+def pressed_keys(fd: int) -> Set[int]:
+    """
+    Returns the keys held down right now.
+
+    :param fd:
+    :return:
+    """
+    bitmap = bytearray((CODE_COUNT[EV_KEY] + 7) // 8)
+    fcntl.ioctl(fd, EVIOCGKEY(len(bitmap)), bitmap)
+
+    return {code for code in range(CODE_COUNT[EV_KEY])
+            if bitmap[code >> 3] & (1 << (code & 7))}
+
+
+def abs_values(fd: int, codes: Iterable[int]) -> Dict[int, int]:
+    """
+    Returns the current value of the given absolute axes.
+
+    :param fd:
+    :param codes:
+    :return:
+    """
+    values = {}
+
+    for code in codes:
+        info = bytearray(ABSINFO.size)
+        fcntl.ioctl(fd, EVIOCGABS(code), info)
+        values[code] = ABSINFO.unpack(info)[0]
+
+    return values
+
+
+def abs_ranges(fd: int, codes: Iterable[int]) -> Dict[int, Tuple[int, int]]:
+    """
+    Returns the minimum and maximum value of the given absolute axes.
+
+    :param fd:
+    :param codes:
+    :return:
+    """
+    ranges = {}
+
+    for code in codes:
+        info = bytearray(ABSINFO.size)
+        fcntl.ioctl(fd, EVIOCGABS(code), info)
+        ranges[code] = ABSINFO.unpack(info)[1:3]
+
+    return ranges
+
+
+class FrameAssembler(object):
+
+    def __init__(self, sync: Callable[[], Optional[State]] = None):
+        """
+        Groups events into frames, one per SYN_REPORT. Key and
+        absolute axis state is tracked so that after a SYN_DROPPED
+        the frame that follows brings consumers back in sync with
+        the device.
+
+        :param sync: returns the pressed keys and the absolute axis
+        values of the device, or None if the state can't be read.
+        """
+        self._sync = sync
+        self._changes: List[Change] = []
+        self._dropping = False
+
+        self.keys: Set[int] = set()
+        self.axes: Dict[int, int] = {}
+        self.dropped = 0
+
+    def feed(self, events: Iterable[RawEvent]) -> List[InputFrame]:
+        """
+        Returns the frames completed by a batch of events.
+
+        :param events:
+        :return:
+        """
+        frames = []
+        changes = self._changes
+        keys, axes = self.keys, self.axes
+
+        for timestamp, type_, code, value in events:
+            if type_ == EV_SYN:
+                if code == SYN_REPORT:
+                    if self._dropping:
+                        self._dropping = False
+                        frames.append(self.resync(timestamp))
+                    elif changes:
+                        frames.append(InputFrame(timestamp, tuple(changes)))
+                    changes.clear()
+
+                elif code == SYN_DROPPED:
+                    # Everything up to the next SYN_REPORT is incomplete.
+                    self._dropping = True
+                    self.dropped += 1
+                    changes.clear()
+
+            elif not self._dropping:
+                changes.append((type_, code, value))
+
+                if type_ == EV_ABS:
+                    axes[code] = value
+                elif type_ == EV_KEY:
+                    if value:
+                        keys.add(code)
+                    else:
+                        keys.discard(code)
+
+        return frames
+
+    def resync(self, timestamp: int) -> InputFrame:
+        """
+        Reads the device state and returns the changes against the
+        tracked state. Without a state the frame has no changes, it
+        only flags the loss.
+
+        :param timestamp:
+        :return:
+        """
+        state = self._sync() if self._sync is not None else None
+        if state is None:
+            return InputFrame(timestamp, (), True)
+
+        keys, axes = state
+        changes = [(EV_KEY, code, 0) for code in sorted(self.keys - keys)]
+        changes.extend((EV_KEY, code, 1) for code in sorted(keys - self.keys))
+        changes.extend((EV_ABS, code, value) for code, value in sorted(axes.items())
+                       if self.axes.get(code) != value)
+
+        # Updated in place, 'feed' holds references to both.
+        self.keys.clear()
+        self.keys.update(keys)
+        self.axes.update(axes)
+
+        return InputFrame(timestamp, tuple(changes), True)
@@ -0,0 +1,196 @@
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence, Union
+
+from config.settings import AXIS_DEADZONE, AXIS_EXPO, AXIS_SMOOTHING
+
+from .evdev import (
+    ABS_RX, ABS_RY, ABS_X, ABS_Y, EV_ABS, InputFrame, RawEvent, abs_ranges, supported
+)
+
+
+STICKS = (ABS_X, ABS_Y, ABS_RX, ABS_RY)
+
+# Raw events up to a SYN_REPORT, or a frame assembled by the device
+Frame = Union[InputFrame, Iterable[RawEvent]]
+
+
+@lru_cache(maxsize=None)
+def curve(minimum: int, maximum: int, deadzone: float, expo: float) -> array:
+    """
+    Lookup table mapping every raw value of an axis to the [-1, 1]
+    range, with the deadzone removed and the expo curve applied.
+    Axes sharing the same settings share the table.
+
+    :param minimum:
+    :param maximum:
+    :param deadzone:
+    :param expo:
+    :return:
+    """
+    center = (maximum + minimum) / 2
+    scale = 2 / (maximum - minimum)
+    linear = 1 - expo
+
+    table = array('d', bytes(8 * (maximum - minimum + 1)))
+
+    for i in range(len(table)):
+        value = (minimum + i - center) * scale
+        magnitude = min(abs(value), 1.)
+
+        if magnitude > deadzone:
+            magnitude = (magnitude - deadzone) / (1 - deadzone)
+            magnitude = linear * magnitude + expo * magnitude * magnitude * magnitude
+            table[i] = magnitude if value > 0 else -magnitude
+
+    return table
+
+
+class AxisFilter(object):
+
+    def __init__(self, minimum: int = -32768, maximum: int = 32767, *,
+                 deadzone: float = AXIS_DEADZONE, expo: float = AXIS_EXPO,
+                 smoothing: float = AXIS_SMOOTHING):
+        """
+        Filter for a single absolute axis. Deadzone removal and the
+        expo curve are precomputed into a lookup table indexed by the
+        raw value, so shaping an event is a single array access.
+
+        :param minimum: lowest raw value reported by the axis.
+        :param maximum: highest raw value reported by the axis.
+        :param deadzone: fraction of the travel around the center
+            that is ignored.
+        :param expo: blend between a linear (0) and a cubic (1) curve.
+        :param smoothing: low-pass factor applied once per frame, 0
+            disables it.
+        """
+        if not 0 <= smoothing < 1:
+            raise ValueError("Smoothing must be in the [0, 1) range.")
+
+        self.minimum = minimum
+        self.maximum = maximum
+        self.deadzone = deadzone
+        self.expo = expo
+        self.smoothing = smoothing
+
+        self.table = curve(minimum, maximum, deadzone, expo)
+
+    def shape(self, raw: int) -> float:
+        """
+        Maps a raw value to the [-1, 1] range.
+
+        :param raw:
+        :return:
+        """
+        return self.table[min(max(raw - self.minimum, 0), len(self.table) - 1)]
+
+
+class FilterPipeline(object):
+
+    def __init__(self, filters: Dict[int, AxisFilter] = None):
+        """
+        Applies a set of axis filters over whole SYN frames, either the
+        raw events of a frame or the InputFrame objects yielded by the
+        devices. Within a frame only the last value of each axis
+        matters, so the lookup and the smoothing run once per axis and
+        frame instead of once per event.
+
+        :param filters: axis filter by ABS code, one filter per stick
+            axis with the default settings if not given.
+        """
+        if filters is None:
+            filters = {code: AxisFilter() for code in STICKS}
+
+        self.codes: Sequence[int] = tuple(filters)
+        self.filters: List[AxisFilter] = list(filters.values())
+
+        # Filtered value of each axis, in the same order as codes.
+        self.values = array('d', bytes(8 * len(self.codes)))
+
+        self._index = {code: i for i, code in enumerate(self.codes)}
+        self._axes = [(i, f.table, f.minimum, len(f.table) - 1, 1 - f.smoothing)
+                      for i, f in enumerate(self.filters)]
+        self._raw = [(f.minimum + f.maximum) // 2 for f in self.filters]
+
+    @classmethod
+    def from_device(cls, fd: int, codes: Sequence[int] = STICKS,
+                    **settings) -> 'FilterPipeline':
+        """
+        Pipeline for the axes of an open device, every filter covers
+        the range its axis reports. Axes the device doesn't have are
+        left out, devices that can't be queried (virtual ones) get
+        the default range.
+
+        :param fd:
+        :param codes: ABS codes of the axes.
+        :param settings: AxisFilter keyword arguments.
+        :return:
+        """
+        try:
+            available = set(supported(fd, EV_ABS))
+            ranges = abs_ranges(fd, [code for code in codes if code in available])
+        except OSError:
+            return cls({code: AxisFilter(**settings) for code in codes})
+
+        return cls({code: AxisFilter(*ranges[code], **settings) for code in ranges})
+
+    def update(self, frame: Frame) -> array:
+        """
+        Applies the events of a single frame and returns the filtered
+        value of every axis.
+
+        :param frame:
+        :return:
+        """
+        self._apply(frame)
+        return self.values
+
+    def update_batch(self, frames: Iterable[Frame]) -> array:
+        """
+        Applies a batch of frames in order and returns the filtered
+        value of every axis after the last one.
+
+        :param frames:
+        :return:
+        """
+        apply = self._apply
+
+        for frame in frames:
+            apply(frame)
+
+        return self.values
+
+    def _apply(self, frame: Frame) -> None:
+        """
+        Keeps the last raw value of every axis in the frame, then runs
+        the lookup and the smoothing once per axis.
+
+        :param frame:
+        :return:
+        """
+        raw, index, values = self._raw, self._index, self.values
+
+        if isinstance(frame, InputFrame):
+            for type_, code, value in frame.changes:
+                if type_ == EV_ABS and code in index:
+                    raw[index[code]] = value
+        else:
+            for _, type_, code, value in frame:
+                if type_ == EV_ABS and code in index:
+                    raw[index[code]] = value
+
+        for i, table, minimum, last, alpha in self._axes:
+            offset = raw[i] - minimum
+            if not 0 <= offset <= last:
+                offset = 0 if offset < 0 else last
+
+            values[i] += alpha * (table[offset] - values[i])
+
+    def __getitem__(self, code: int) -> float:
+        """
+        Filtered value of an axis by its ABS code.
+
+        :param code:
+        :return:
+        """
+        return self.values[self._index[code]]
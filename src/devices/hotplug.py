@@ -0,0 +1,135 @@
+import asyncio
+import ctypes
+import ctypes.util
+import os
+from typing import List, Optional, Sequence
+
+from config.settings import HOTPLUG_PATHS
+
+
+# inotify(7) flags
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+IN_ATTRIB = 0x00000004
+IN_CREATE = 0x00000100
+IN_MOVED_TO = 0x00000080
+
+# A new node shows up with IN_CREATE, udev fixes its permissions
+# right after (IN_ATTRIB) and symlinks are moved into place.
+WATCH_MASK = IN_CREATE | IN_ATTRIB | IN_MOVED_TO
+
+
+def _libc() -> Optional[ctypes.CDLL]:
+    """
+    Returns the C library if it provides inotify.
+
+    :return:
+    """
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+    except OSError:
+        return None
+
+    if not hasattr(libc, 'inotify_init1'):
+        return None
+
+    return libc
+
+
+class HotplugWatcher(object):
+
+    def __init__(self, paths: Sequence[str] = HOTPLUG_PATHS,
+                 loop: asyncio.AbstractEventLoop = None):
+        """
+        Wakes up waiters when device nodes appear in the watched
+        directories. Uses inotify, so nothing runs while nothing
+        changes; where inotify is not available waiting falls back
+        to a plain sleep.
+
+        :param paths:
+        :param loop:
+        """
+        self._loop = loop or asyncio.get_event_loop()
+        self._paths = paths
+
+        self.fd: Optional[int] = None
+        self.watching: List[str] = []
+        self._changed = asyncio.Event()
+
+    def open(self) -> bool:
+        """
+        Starts watching, returns False if inotify is not available.
+
+        :return:
+        """
+        if self.fd is not None:
+            return True
+
+        libc = _libc()
+        if libc is None:
+            return False
+
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return False
+
+        for path in self._paths:
+            if libc.inotify_add_watch(fd, os.fsencode(path), WATCH_MASK) >= 0:
+                self.watching.append(path)
+
+        self.fd = fd
+        self._loop.add_reader(fd, self._drain)
+        return True
+
+    def close(self) -> None:
+        """
+        Stops watching.
+
+        :return:
+        """
+        if self.fd is None:
+            return
+
+        self._loop.remove_reader(self.fd)
+        os.close(self.fd)
+        self.fd = None
+        self.watching = []
+
+    def _drain(self) -> None:
+        """
+        Discards the pending inotify events, any of them is enough
+        to try again.
+
+        :return:
+        """
+        try:
+            while os.read(self.fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+        self._changed.set()
+
+    def notify(self) -> None:
+        """
+        Wakes up the waiters without a change.
+
+        :return:
+        """
+        self._changed.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        Waits until something changes in the watched directories
+        or the timeout expires. Returns True on changes.
+
+        :param timeout:
+        :return:
+        """
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+
+        self._changed.clear()
+        return True
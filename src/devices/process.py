@@ -0,0 +1,413 @@
+import asyncio
+import os
+import signal
+import struct
+import time
+from typing import Iterable, List, Mapping, Optional, Sequence
+
+from inputs import InputDevice, UnpluggedError, devices
+
+from .abstract import AbstractDevice
+from .evdev import EVENT_SIZE, READ_SIZE, RawEvent, decode, grab, set_clock, set_mask
+
+
+# Sequence number published by the producer, sequence number up to
+# which the producer may be writing, and the clock used by the device
+# for the timestamps.
+HEADER = struct.Struct('QQq')
+RECORD = struct.Struct('qHHi')
+
+# The producer writes a whole read, at most this many records, at once.
+BATCH_SIZE = READ_SIZE // EVENT_SIZE
+
+
+class EventRing(object):
+
+    def __init__(self, capacity: int = 4096):
+        """
+        Single producer, single consumer ring buffer of input events
+        living in shared memory. Records are fixed size structs, so
+        events cross the process boundary without being pickled.
+
+        The header works as a sequence lock: before writing a batch
+        the producer announces the sequence it writes up to, once the
+        records are written it publishes them by advancing the head.
+        The consumer only drops the slots that are actually being
+        rewritten.
+
+        :param capacity:
+        """
+        from multiprocessing import shared_memory
+
+        if capacity < BATCH_SIZE:
+            raise ValueError("Capacity must hold {} events".format(BATCH_SIZE))
+
+        self.capacity = capacity
+        self.sequence = 0
+        self.overruns = 0
+
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=HEADER.size + RECORD.size * capacity)
+        self._buf = self._shm.buf
+        HEADER.pack_into(self._buf, 0, 0, 0, time.CLOCK_REALTIME)
+
+    @property
+    def head(self) -> int:
+        """
+        Sequence number published by the producer.
+
+        :return:
+        """
+        return HEADER.unpack_from(self._buf)[0]
+
+    @property
+    def writing(self) -> int:
+        """
+        Sequence number up to which the producer may be writing.
+
+        :return:
+        """
+        return HEADER.unpack_from(self._buf)[1]
+
+    @property
+    def clock_id(self) -> int:
+        """
+        Clock of the event timestamps.
+
+        :return:
+        """
+        return HEADER.unpack_from(self._buf)[2]
+
+    @clock_id.setter
+    def clock_id(self, clock_id: int) -> None:
+        HEADER.pack_into(self._buf, 0, self.sequence, self.sequence, clock_id)
+
+    def push(self, events: Sequence[RawEvent]) -> None:
+        """
+        Writes a batch of events and publishes it. Only the producer
+        process calls this method.
+
+        :param events:
+        :return:
+        """
+        buf, capacity, pack_into = self._buf, self.capacity, RECORD.pack_into
+        sequence = self.sequence
+
+        struct.pack_into('Q', buf, 8, sequence + len(events))
+
+        for event in events:
+            pack_into(buf, HEADER.size + (sequence % capacity) * RECORD.size, *event)
+            sequence += 1
+
+        struct.pack_into('Q', buf, 0, sequence)
+        self.sequence = sequence
+
+    def pull(self) -> List[RawEvent]:
+        """
+        Returns every event published since the last call. Events
+        overwritten by a producer that lapped the consumer are
+        dropped and counted as overruns. Only the consumer process
+        calls this method.
+
+        :return:
+        """
+        buf, capacity, unpack_from = self._buf, self.capacity, RECORD.unpack_from
+
+        head = self.head
+        start = min(max(self.sequence, self.writing - capacity), head)
+
+        events = [
+            RawEvent(*unpack_from(buf, HEADER.size + (i % capacity) * RECORD.size))
+            for i in range(start, head)
+        ]
+
+        # The producer could have started rewriting some of the slots
+        # while they were being copied. Events past the head are only
+        # counted by the next call.
+        lapped = min(self.writing - capacity, head) - start
+        if lapped > 0:
+            del events[:lapped]
+            start += lapped
+
+        self.overruns += start - self.sequence
+        self.sequence = head
+
+        return events
+
+    def close(self) -> None:
+        """
+        Releases this process view of the shared memory.
+
+        :return:
+        """
+        self._buf.release()
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """
+        Destroys the shared memory block.
+
+        :return:
+        """
+        self._shm.unlink()
+
+
+def read_events(path: str, ring: EventRing, notify: int,
+                events: Optional[Mapping[int, Iterable[int]]] = None,
+                exclusive: bool = False) -> None:
+    """
+    Entry point of the reader process. Blocks on the device, pushes
+    every batch into the ring and wakes the consumer up writing a
+    byte to the notification pipe.
+
+    :param path:
+    :param ring:
+    :param notify:
+    :param events: codes by event type the kernel delivers, None for all.
+    :param exclusive: takes an exclusive grab of the device.
+    :return:
+    """
+    # The parent process decides when the reader must stop.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    fd = os.open(path, os.O_RDONLY)
+    ring.clock_id = set_clock(fd)
+
+    if events is not None:
+        set_mask(fd, events)
+    if exclusive:
+        grab(fd)
+
+    try:
+        while True:
+            data = os.read(fd, READ_SIZE)
+            if not data:
+                break
+
+            ring.push(list(decode(data)))
+
+            try:
+                os.write(notify, b'\x00')
+            except BlockingIOError:
+                # The consumer already has pending wakeups.
+                pass
+
+    except OSError:
+        # The device has been unplugged.
+        pass
+
+    finally:
+        # Exiting closes the pipe, which lets the consumer know.
+        os.close(fd)
+        ring.close()
+
+
+class IsolatedDevice(AbstractDevice):
+
+    def __init__(self, *, maxsize: int = 0, timeout: int = 100,
+                 loop: asyncio.AbstractEventLoop = None, device: InputDevice,
+                 capacity: int = 4096):
+        """
+        Device that reads its events in a dedicated process, so input
+        latency isn't affected by anything running in the event loop
+        of the main process. Events are received in batches through
+        a shared memory ring buffer.
+
+        :param maxsize:
+        :param timeout:
+        :param loop:
+        :param device:
+        :param capacity:
+        """
+        super().__init__(maxsize=maxsize, timeout=timeout, loop=loop, device=device)
+
+        self._device = device
+        self._capacity = capacity
+
+        # Kernel side filtering, applied by the reader process.
+        self.events: Optional[Mapping[int, Iterable[int]]] = None
+        self.exclusive = False
+
+        self.ring: Optional[EventRing] = None
+        self.process = None
+        self.task_read: asyncio.Task = None
+
+        self._notify: Optional[int] = None
+        self._ready = asyncio.Event()
+        self._unplugged = False
+
+    @property
+    def devices(self) -> List[InputDevice]:
+        """
+        Returns a list of available devices.
+
+        :return:
+        """
+        return devices.all_devices
+
+    async def get_device(self, index: int = 0) -> InputDevice:
+        """
+        Returns device from available devices list.
+
+        :param index:
+        :return:
+        """
+        try:
+            device = self._device or self.devices[index]
+        except IndexError:
+            raise UnpluggedError("No device found.")
+        return device
+
+    def mask(self, events: Optional[Mapping[int, Iterable[int]]]) -> None:
+        """
+        Restricts the events the kernel delivers to the reader process
+        to the given codes, None to receive every event. Takes effect
+        when the process starts.
+
+        :param events: codes by event type.
+        :return:
+        """
+        self.events = events
+
+    def grab(self, exclusive: bool = True) -> None:
+        """
+        Makes the reader process take an exclusive grab of the device.
+        Takes effect when the process starts.
+
+        :param exclusive:
+        :return:
+        """
+        self.exclusive = exclusive
+
+    def open(self) -> None:
+        """
+        Starts the reader process.
+
+        :return:
+        """
+        import multiprocessing
+
+        self.ring = EventRing(self._capacity)
+        self._notify, notify = os.pipe()
+        os.set_blocking(self._notify, False)
+        os.set_blocking(notify, False)
+
+        # Fork, the child inherits the shared memory mapping and the
+        # pipe so there is nothing to pickle.
+        context = multiprocessing.get_context('fork')
+        self.process = context.Process(
+            target=read_events, daemon=True,
+            args=(self._device.get_char_device_path(), self.ring, notify,
+                  self.events, self.exclusive))
+        self.process.start()
+
+        os.close(notify)
+        self._loop.add_reader(self._notify, self._wakeup)
+
+    def close(self) -> None:
+        """
+        Stops the reader process and releases its resources.
+
+        :return:
+        """
+        self.unregister()
+
+        if self.process is None:
+            return
+
+        self._loop.remove_reader(self._notify)
+        self.process.terminate()
+        self.process.join()
+        self.process = None
+
+        os.close(self._notify)
+        self.ring.close()
+        self.ring.unlink()
+
+    def _wakeup(self) -> None:
+        """
+        Drains the notification pipe.
+
+        :return:
+        """
+        if not os.read(self._notify, 4096):
+            self._loop.remove_reader(self._notify)
+            self._unplugged = True
+
+        self._ready.set()
+
+    def read(self) -> List[RawEvent]:
+        """
+        Returns the events received since the last read.
+
+        :return:
+        """
+        self.clock_id = self.ring.clock_id
+        return self.ring.pull()
+
+    async def read_batch(self) -> List[RawEvent]:
+        """
+        Waits until the reader process publishes new events and
+        returns all of them.
+
+        :return:
+        """
+        await self._ready.wait()
+        self._ready.clear()
+
+        events = self.read()
+        if not events and self._unplugged:
+            raise UnpluggedError("Device unplugged.")
+
+        return events
+
+    async def on_read(self) -> None:
+        """
+        Moves every batch of events into the device buffer.
+
+        :return:
+        """
+        put_nowait = self.put_nowait
+
+        while True:
+            for event in await self.read_batch():
+                put_nowait(event)
+
+    async def start(self) -> None:
+        """
+        Starts the reader process and waits until the device is
+        unplugged or the reading is stopped.
+
+        :return:
+        """
+        self.open()
+        self.task_read = self._loop.create_task(self.on_read())
+
+        try:
+            await self.task_read
+        finally:
+            self.close()
+
+    async def stop(self) -> None:
+        """
+        Stops the device reading task.
+
+        :return:
+        """
+        if self.task_read is None:
+            return
+
+        self.task_read.cancel()
+
+        try:
+            await self.task_read
+        except asyncio.CancelledError:
+            pass
+
+    def __repr__(self):
+        return '<{}[{}] at {:#x} {}>'.format(
+            type(self).__name__, self._device, id(self), self._buffer)
+
+    def __str__(self):
+        return '<{}[{}] {}>'.format(
+            type(self).__name__, self._device, self._buffer)
@@ -0,0 +1,229 @@
+from array import array
+from typing import Callable, Iterable, Optional, TypeVar
+
+from .evdev import (
+    CODE_COUNT, EV_ABS, EV_KEY, EV_REL, EV_SYN, SYN_DROPPED, SYN_REPORT, InputFrame,
+    RawEvent, State
+)
+
+
+T = TypeVar('T')
+
+
+class KeyBitmap(bytearray):
+    """
+    Key state indexed by key code, one bit per key like the
+    kernel bitmaps.
+    """
+
+    def __init__(self, count: int = CODE_COUNT[EV_KEY]):
+        super().__init__((count + 7) // 8)
+
+    def set(self, code: int, pressed: bool) -> None:
+        if pressed:
+            self[code >> 3] |= 1 << (code & 7)
+        else:
+            self[code >> 3] &= ~(1 << (code & 7)) & 0xff
+
+    def test(self, code: int) -> bool:
+        return bool(self[code >> 3] & (1 << (code & 7)))
+
+    def codes(self) -> Iterable[int]:
+        """
+        Codes of the keys held down.
+
+        :return:
+        """
+        for index, byte in enumerate(self):
+            while byte:
+                bit = byte & -byte
+                yield (index << 3) + bit.bit_length() - 1
+                byte ^= bit
+
+
+class StateBuffer(object):
+
+    __slots__ = ('keys', 'axes', 'motion', 'generation', 'timestamp')
+
+    def __init__(self):
+        """
+        Preallocated device state: key bitmap, absolute axis values
+        and relative motion accumulated since the device was opened
+        (readers get the motion between two snapshots by difference).
+        """
+        self.keys = KeyBitmap()
+        self.axes = array('i', bytes(4 * CODE_COUNT[EV_ABS]))
+        self.motion = array('q', bytes(8 * CODE_COUNT[EV_REL]))
+        self.generation = 0
+        self.timestamp = 0
+
+    def copy_from(self, other: 'StateBuffer') -> None:
+        """
+        Overwrites the state with another buffer's, without allocating.
+        The generation is left alone.
+
+        :param other:
+        :return:
+        """
+        self.keys[:] = other.keys
+        self.axes[:] = other.axes
+        self.motion[:] = other.motion
+        self.timestamp = other.timestamp
+
+    def pressed(self, code: int) -> bool:
+        return self.keys.test(code)
+
+    def __repr__(self):
+        return '<{} generation={} keys={} axes={}>'.format(
+            type(self).__name__, self.generation, list(self.keys.codes()),
+            {code: value for code, value in enumerate(self.axes) if value})
+
+
+class DeviceState(object):
+
+    def __init__(self, sync: Callable[[], Optional[State]] = None):
+        """
+        Double buffered device state. The device pump writes into the
+        back buffer and publishes it on every SYN_REPORT, swapping it
+        with the front buffer the readers see. Any number of readers
+        can take snapshots without copying and without competing for
+        queue items. A snapshot is consistent until the next publish.
+
+        Generations work as a sequence lock: published buffers have
+        even generations, a buffer being written has an odd one. Readers
+        that keep a snapshot across awaits or read it from another
+        thread use 'read', or check 'consistent' after using it.
+
+        :param sync: returns the pressed keys and the absolute axis
+        values of the device, used after the kernel drops events.
+        """
+        self._sync = sync
+        self._front = StateBuffer()
+        self._back = StateBuffer()
+        self._back.generation = 1
+        self._dropping = False
+
+        self.generation = 0
+
+    def snapshot(self) -> StateBuffer:
+        """
+        Returns the last published state.
+
+        :return:
+        """
+        return self._front
+
+    def publish(self, timestamp: int) -> None:
+        """
+        Makes the back buffer visible to the readers.
+
+        :param timestamp:
+        :return:
+        """
+        front = self._back
+        self.generation += 2
+        front.timestamp = timestamp
+        front.generation = self.generation
+
+        # The old front buffer is written from now on, readers still
+        # holding it see an odd generation.
+        back = self._front
+        back.generation = self.generation + 1
+        self._front, self._back = front, back
+        back.copy_from(front)
+
+    @staticmethod
+    def consistent(snapshot: StateBuffer, generation: int) -> bool:
+        """
+        Whether a snapshot that had a given generation when the reader
+        started using it wasn't written meanwhile.
+
+        :param snapshot:
+        :param generation:
+        :return:
+        """
+        return not generation & 1 and snapshot.generation == generation
+
+    def read(self, reader: Callable[[StateBuffer], T]) -> T:
+        """
+        Calls reader with the last published state until it runs on
+        a state that isn't modified meanwhile, returns its result.
+
+        :param reader:
+        :return:
+        """
+        while True:
+            snapshot = self._front
+            generation = snapshot.generation
+            result = reader(snapshot)
+
+            if self.consistent(snapshot, generation):
+                return result
+
+    def update(self, events: Iterable[RawEvent]) -> None:
+        """
+        Writes a batch of events, publishing on every SYN_REPORT.
+
+        :param events:
+        :return:
+        """
+        for timestamp, type_, code, value in events:
+            back = self._back
+
+            if type_ == EV_SYN:
+                if code == SYN_REPORT:
+                    if self._dropping:
+                        self._dropping = False
+                        self.resync()
+                    self.publish(timestamp)
+                elif code == SYN_DROPPED:
+                    self._dropping = True
+
+            elif self._dropping:
+                continue
+
+            elif type_ == EV_ABS:
+                back.axes[code] = value
+            elif type_ == EV_REL:
+                back.motion[code] += value
+            elif type_ == EV_KEY:
+                back.keys.set(code, value)
+
+    def apply(self, frame: InputFrame) -> None:
+        """
+        Writes and publishes a frame.
+
+        :param frame:
+        :return:
+        """
+        back = self._back
+
+        for type_, code, value in frame.changes:
+            if type_ == EV_ABS:
+                back.axes[code] = value
+            elif type_ == EV_REL:
+                back.motion[code] += value
+            elif type_ == EV_KEY:
+                back.keys.set(code, value)
+
+        self.publish(frame.timestamp)
+
+    def resync(self) -> None:
+        """
+        Replaces keys and axes of the back buffer with the device
+        state, if it can be read.
+
+        :return:
+        """
+        state = self._sync() if self._sync is not None else None
+        if state is None:
+            return
+
+        keys, axes = state
+        back = self._back
+        back.keys[:] = bytes(len(back.keys))
+
+        for code in keys:
+            back.keys.set(code, True)
+        for code, value in axes.items():
+            back.axes[code] = value
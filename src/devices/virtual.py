@@ -0,0 +1,216 @@
+import asyncio
+import random
+import socket
+import time
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+from .base import BaseDevice
+from .devices import GamePad, Keyboard, Mouse
+from .evdev import (
+    ABS_RX, ABS_RY, ABS_X, ABS_Y, EV_ABS, EV_KEY, EV_REL, EV_SYN, READ_SIZE, REL_X,
+    REL_Y, SYN_REPORT, encode
+)
+
+
+Event = Tuple[int, int, int]
+Frame = Sequence[Event]
+
+# Interval between writes when playing at a given rate, every write
+# carries all the frames due since the previous one.
+WRITE_INTERVAL = .001
+
+
+class VirtualInputDevice(object):
+
+    def __init__(self, name: str = 'Virtual device'):
+        """
+        Stand-in for 'inputs.InputDevice' describing a virtual device.
+
+        :param name:
+        """
+        self.name = name
+
+    def get_char_device_path(self) -> str:
+        return 'virtual:{}'.format(self.name)
+
+    def __str__(self):
+        return self.name
+
+
+class VirtualDevice(BaseDevice):
+
+    def __init__(self, *, maxsize: int = 0, timeout: int = 100,
+                 loop: asyncio.AbstractEventLoop = None,
+                 device: VirtualInputDevice = None):
+        """
+        Device backed by a socket pair instead of an evdev character
+        device. Events written to one end are read from the other by
+        the regular device machinery, so everything downstream (loop
+        readers, buffer, controllers) runs unmodified, without input
+        hardware.
+
+        :param maxsize:
+        :param timeout:
+        :param loop:
+        :param device:
+        """
+        super().__init__(maxsize=maxsize, timeout=timeout, loop=loop,
+                         device=device or VirtualInputDevice())
+
+    @property
+    def devices(self) -> List[VirtualInputDevice]:
+        return [self._device]
+
+    def open(self) -> int:
+        """
+        Creates the socket pair, the device reads from one end.
+        Events are timestamped with the monotonic clock. Like reads
+        from an evdev node, every read returns whole events: the
+        sockets keep message boundaries and no message is longer
+        than a read.
+
+        :return:
+        """
+        self.clock_id = time.CLOCK_MONOTONIC
+        self._reader, self._writer = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        self._reader.setblocking(False)
+        self._writer.setblocking(False)
+
+        return self._reader.fileno()
+
+    def release(self) -> None:
+        """
+        Closes both ends of the socket pair.
+
+        :return:
+        """
+        if self.fd is None:
+            return
+
+        self._loop.remove_reader(self.fd)
+        self._writer.close()
+        self._reader.close()
+        self.fd = None
+
+    def emit(self, events: Iterable[Event], timestamp: int = None) -> None:
+        """
+        Writes events right away. Raises BlockingIOError if the
+        socket buffer is full.
+
+        :param events:
+        :param timestamp:
+        :return:
+        """
+        data = encode(events, timestamp or time.monotonic_ns())
+
+        for offset in range(0, len(data), READ_SIZE):
+            self._writer.send(data[offset:offset + READ_SIZE])
+
+    async def play(self, frames: Iterable[Frame], rate: float) -> int:
+        """
+        Writes frames at a given rate in frames per second. Frames are
+        written in batches, so rates far above the loop wakeup rate are
+        possible, and the write waits when the reader falls behind.
+        Returns the number of events written.
+
+        :param frames:
+        :param rate:
+        :return:
+        """
+        frames = iter(frames)
+        start = self._loop.time()
+        sent = written = 0
+
+        while True:
+            due = int((self._loop.time() - start) * rate) + 1
+            timestamp = time.monotonic_ns()
+            batch: List[Event] = []
+
+            for frame in frames:
+                batch.extend(frame)
+                sent += 1
+                if sent >= due:
+                    break
+
+            if not batch:
+                return written
+
+            data = encode(batch, timestamp)
+            for offset in range(0, len(data), READ_SIZE):
+                await self._loop.sock_sendall(self._writer, data[offset:offset + READ_SIZE])
+            written += len(batch)
+
+            await asyncio.sleep(max(
+                start + sent / rate - self._loop.time(), WRITE_INTERVAL))
+
+
+class VirtualGamePad(VirtualDevice, GamePad):
+    pass
+
+
+class VirtualMouse(VirtualDevice, Mouse):
+    pass
+
+
+class VirtualKeyboard(VirtualDevice, Keyboard):
+    pass
+
+
+def syn(*events: Event) -> Frame:
+    """
+    Frame with the given events followed by a SYN_REPORT.
+
+    :param events:
+    :return:
+    """
+    return events + ((EV_SYN, SYN_REPORT, 0),)
+
+
+def random_sticks(minimum: int = -32768, maximum: int = 32767,
+                  codes: Sequence[int] = (ABS_X, ABS_Y, ABS_RX, ABS_RY)) -> Iterator[Frame]:
+    """
+    Endless gamepad frames moving every stick axis randomly.
+
+    :param minimum:
+    :param maximum:
+    :param codes:
+    :return:
+    """
+    randint = random.randint
+
+    while True:
+        yield syn(*((EV_ABS, code, randint(minimum, maximum)) for code in codes))
+
+
+def random_motion(step: int = 10) -> Iterator[Frame]:
+    """
+    Endless mouse frames with random relative motion.
+
+    :param step:
+    :return:
+    """
+    randint = random.randint
+
+    while True:
+        yield syn((EV_REL, REL_X, randint(-step, step)), (EV_REL, REL_Y, randint(-step, step)))
+
+
+def random_keys(codes: Sequence[int]) -> Iterator[Frame]:
+    """
+    Endless frames pressing and releasing random keys.
+
+    :param codes:
+    :return:
+    """
+    pressed = set()
+    choice = random.choice
+
+    while True:
+        code = choice(codes)
+
+        if code in pressed:
+            pressed.remove(code)
+            yield syn((EV_KEY, code, 0))
+        else:
+            pressed.add(code)
+            yield syn((EV_KEY, code, 1))
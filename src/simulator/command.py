@@ -0,0 +1,82 @@
+import sys
+from argparse import ArgumentParser
+
+from config.settings import SIMULATOR_VIDEO_FPS
+from core.command import BaseCommandMixin
+
+
+class SimulatorMixin(BaseCommandMixin):
+
+    def __add_arguments(self, parser: ArgumentParser) -> None:
+        """
+
+        :param parser:
+        :return:
+        """
+        parser.add_argument(
+            '--address', default='127.0.0.1:8889',
+            help='Address to listen for commands on')
+        parser.add_argument(
+            '--loss', type=float, default=0.,
+            help='Probability of losing a packet')
+        parser.add_argument(
+            '--reorder', type=float, default=0.,
+            help='Probability of reordering a packet')
+        parser.add_argument(
+            '--latency', type=float, default=0.,
+            help='Latency in milliseconds')
+        parser.add_argument(
+            '--jitter', type=float, default=0.,
+            help='Maximum random latency added, in milliseconds')
+        parser.add_argument(
+            '--video', metavar='FILE',
+            help='H.264 stream replayed to the video port')
+        parser.add_argument(
+            '--fps', type=float, default=SIMULATOR_VIDEO_FPS,
+            help='Video frames per second')
+
+        self.add_arguments(parser)
+
+    def __parse_arguments(self):
+        """
+
+        :return:
+        """
+        parser = self._create_parser()
+        self.__add_arguments(parser)
+
+        return parser.parse_args(sys.argv[2:])
+
+    def simulator(self) -> None:
+        """
+
+        :return:
+        """
+        from simulator.drone import DroneSimulator, Impairment
+
+        args = self.__parse_arguments()
+
+        host, _, port = args.address.rpartition(':')
+        video = None
+
+        if args.video:
+            with open(args.video, 'rb') as file:
+                video = file.read()
+
+        impairment = Impairment(
+            self._loop, loss=args.loss, reorder=args.reorder,
+            latency=args.latency / 1000, jitter=args.jitter / 1000)
+        drone = DroneSimulator(
+            impairment=impairment, video=video, fps=args.fps,
+            loop=self._loop)
+
+        print("Simulating drone on {}...".format(args.address))
+
+        try:
+            self._loop.run_until_complete(drone.start((host, int(port))))
+            self._loop.run_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._loop.run_until_complete(drone.stop())
+            self._loop.close()
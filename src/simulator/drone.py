@@ -0,0 +1,354 @@
+import asyncio
+import math
+import random
+import re
+from typing import Iterator, List, Optional, Tuple
+
+from config.settings import (
+    CONTROL_RATE, SIMULATOR_FLIGHT_RATE, SIMULATOR_WIFI_RATE, SIMULATOR_VIDEO_FPS
+)
+from core.packet import Packet, PacketError
+from core.protocol import (
+    LAND_CMD, PALM_LAND_CMD, STICK_CMD, TAKEOFF_CMD, THROW_AND_GO_CMD
+)
+from core.telemetry import FlightData, Sticks, WifiData
+
+
+Address = Tuple[str, int]
+
+# Maximum horizontal and vertical speeds in m/s, yaw rate in rad/s,
+# and the time constant of the speed response in seconds.
+MAX_SPEED = 3.5
+MAX_FAST_SPEED = 8.
+MAX_CLIMB = 1.5
+MAX_YAW_RATE = math.radians(100)
+RESPONSE = .3
+
+TAKEOFF_HEIGHT = 1.2
+LAND_SPEED = .5
+
+# Battery drain while flying, in percent per second.
+BATTERY_DRAIN = .1
+
+# Maximum payload of a video packet, including its 2 byte header.
+VIDEO_PACKET_SIZE = 1460
+
+
+class Impairment(object):
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, *, loss: float = 0.,
+                 latency: float = 0., jitter: float = 0., reorder: float = 0.):
+        """
+        Network impairments applied to every datagram sent by the
+        simulator.
+
+        :param loop:
+        :param loss: probability of dropping a datagram.
+        :param latency: delay of every datagram in seconds.
+        :param jitter: maximum random delay added, in seconds.
+        :param reorder: probability of holding a datagram back so it's
+            delivered after the next one.
+        """
+        self._loop = loop
+        self.loss = loss
+        self.latency = latency
+        self.jitter = jitter
+        self.reorder = reorder
+
+        self._held: Optional[Tuple[bytes, Address]] = None
+        self.dropped = 0
+        self.reordered = 0
+
+    def sendto(self, transport: asyncio.DatagramTransport, data: bytes,
+               addr: Address) -> None:
+        """
+        Sends a datagram through the impaired network.
+
+        :param transport:
+        :param data:
+        :param addr:
+        :return:
+        """
+        if self.loss and random.random() < self.loss:
+            self.dropped += 1
+            return
+
+        datagrams = [(data, addr)]
+
+        if self._held is not None:
+            datagrams.append(self._held)
+            self._held = None
+        elif self.reorder and random.random() < self.reorder:
+            self._held = datagrams.pop()
+            self.reordered += 1
+            return
+
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+
+        for datagram in datagrams:
+            if delay:
+                self._loop.call_later(delay, transport.sendto, *datagram)
+            else:
+                transport.sendto(*datagram)
+
+
+def video_packets(data: bytes) -> List[List[bytes]]:
+    """
+    Splits an H.264 Annex B stream in frames, a frame starts at an
+    access unit delimiter, a parameter set or a slice not preceded by
+    other units of the same frame. Every frame is split in video
+    packets, the first header byte is the frame number and the second
+    the packet index with the high bit set in the last packet.
+
+    :param data:
+    :return:
+    """
+    starts: List[int] = []
+    previous = None
+
+    for match in re.finditer(b'\x00\x00\x01', data):
+        pos = match.start()
+        nal = data[pos + 3] & 0x1f if pos + 3 < len(data) else 0
+
+        if not starts or (nal in (1, 5, 7, 9) and previous not in (6, 7, 8, 9)):
+            starts.append(pos - 1 if pos and data[pos - 1] == 0 else pos)
+
+        previous = nal
+
+    frames = [data[start:end] for start, end in zip(starts, starts[1:] + [len(data)])]
+    size = VIDEO_PACKET_SIZE - 2
+    result = []
+
+    for number, frame in enumerate(frames):
+        chunks = [frame[i:i + size] for i in range(0, len(frame), size)]
+        result.append([
+            bytes((number & 0xff, (index & 0x7f) | (0x80 if index == len(chunks) - 1 else 0)))
+            + chunk for index, chunk in enumerate(chunks)
+        ])
+
+    return result
+
+
+class DroneSimulator(asyncio.DatagramProtocol):
+
+    def __init__(self, *, impairment: Impairment = None, video: bytes = None,
+                 fps: float = SIMULATOR_VIDEO_FPS,
+                 flight_rate: float = SIMULATOR_FLIGHT_RATE,
+                 wifi_rate: float = SIMULATOR_WIFI_RATE,
+                 loop: asyncio.AbstractEventLoop = None):
+        """
+        Stand-in for the drone speaking the protocol over UDP. Applies
+        simple flight dynamics to the stick commands, answers every
+        command, emits FLIGHT_MSG and WIFI_MSG telemetry and replays a
+        recorded video stream to the video port requested by the
+        client.
+
+        :param impairment: network impairments of everything sent.
+        :param video: H.264 Annex B stream replayed in a loop.
+        :param fps: video frames per second.
+        :param flight_rate: FLIGHT_MSG per second.
+        :param wifi_rate: WIFI_MSG per second.
+        :param loop:
+        """
+        if loop is None:
+            self._loop = asyncio.get_event_loop()
+        else:
+            self._loop = loop
+
+        self.impairment = impairment or Impairment(self._loop)
+        self.transport: asyncio.DatagramTransport = None
+        self.client: Optional[Address] = None
+        self.video_port: Optional[int] = None
+
+        self._video = video_packets(video) if video else []
+        self._fps = fps
+        self._frame_number = 0
+        self._flight_period = 1 / flight_rate
+        self._wifi_period = 1 / wifi_rate
+        self._tasks: List[asyncio.Task] = []
+
+        self.sticks = Sticks(0., 0., 0., 0., False)
+        self.flying = False
+        self.taking_off = False
+        self.landing = False
+        self.position = [0., 0., 0.]
+        self.velocity = [0., 0., 0.]
+        self.heading = 0.
+        self.battery = 100.
+        self.fly_time = 0.
+        self.received = 0
+
+    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
+        self.transport = transport
+
+    def sendto(self, data: bytes, addr: Address = None) -> None:
+        self.impairment.sendto(self.transport, data, addr or self.client)
+
+    def datagram_received(self, data: bytes, addr: Address) -> None:
+        """
+        Handles the connection request and the commands.
+
+        :param data:
+        :param addr:
+        :return:
+        """
+        if data.startswith(b'conn_req:'):
+            self.client = addr
+            self.video_port = int.from_bytes(data[9:11], 'little')
+            self.transport.sendto(b'conn_ack:' + data[9:11], addr)
+            return
+
+        try:
+            packet = Packet.decode(data)
+        except PacketError:
+            return
+
+        self.client = addr
+        self.received += 1
+
+        if packet.cmd == STICK_CMD:
+            self.sticks = Sticks.decode(packet.payload)
+            return
+
+        if packet.cmd in (TAKEOFF_CMD, THROW_AND_GO_CMD) and not self.flying:
+            self.flying, self.taking_off, self.landing = True, True, False
+        elif packet.cmd in (LAND_CMD, PALM_LAND_CMD) and self.flying:
+            self.landing = True
+
+        # Every command is answered with its own id and sequence.
+        self.sendto(Packet(packet.cmd, b'\x00', packet.pkt_type, packet.seq).encode())
+
+    def step(self, dt: float) -> None:
+        """
+        Advances the flight dynamics.
+
+        :param dt:
+        :return:
+        """
+        position, velocity = self.position, self.velocity
+
+        if not self.flying:
+            velocity[:] = [0., 0., 0.]
+            return
+
+        sticks = self.sticks
+        speed = MAX_FAST_SPEED if sticks.fast else MAX_SPEED
+
+        if self.landing:
+            target = (0., 0., -LAND_SPEED)
+        elif self.taking_off:
+            target = (0., 0., MAX_CLIMB)
+            self.taking_off = position[2] < TAKEOFF_HEIGHT
+        else:
+            # Body frame to north/east.
+            forward, right = sticks.pitch * speed, sticks.roll * speed
+            cos, sin = math.cos(self.heading), math.sin(self.heading)
+            target = (forward * cos - right * sin, forward * sin + right * cos,
+                      sticks.throttle * MAX_CLIMB)
+            self.heading = (self.heading + sticks.yaw * MAX_YAW_RATE * dt) % (2 * math.pi)
+
+        alpha = min(dt / RESPONSE, 1.)
+
+        for i in range(3):
+            velocity[i] += (target[i] - velocity[i]) * alpha
+            position[i] += velocity[i] * dt
+
+        if position[2] <= 0 and not self.taking_off:
+            position[2] = 0.
+            self.flying = self.landing = False
+
+        self.fly_time += dt
+        self.battery = max(self.battery - BATTERY_DRAIN * dt, 0.)
+
+    def flight_data(self) -> FlightData:
+        north, east, up = self.velocity
+
+        return FlightData(
+            height=int(self.position[2] * 10),
+            north_speed=int(north * 10),
+            east_speed=int(east * 10),
+            ground_speed=int(up * 10),
+            fly_time=int(self.fly_time * 10),
+            battery_percentage=int(self.battery),
+            em_state=int(self.flying),
+        )
+
+    def wifi_data(self) -> WifiData:
+        strength = 90 - 100 * self.impairment.loss - random.randint(0, 5)
+        return WifiData(max(int(strength), 0), 0)
+
+    async def on_tick(self) -> None:
+        """
+        Runs the flight dynamics at the control rate and sends the
+        telemetry at its own rates.
+
+        :return:
+        """
+        period = 1 / CONTROL_RATE
+        deadline = flight = wifi = self._loop.time()
+
+        while True:
+            self.step(period)
+            now = self._loop.time()
+
+            if self.client is not None:
+                if now >= flight:
+                    flight += self._flight_period
+                    self.sendto(self.flight_data().packet().encode())
+                if now >= wifi:
+                    wifi += self._wifi_period
+                    self.sendto(self.wifi_data().packet().encode())
+
+            deadline += period
+            await asyncio.sleep(max(deadline - self._loop.time(), 0))
+
+    async def on_video(self) -> None:
+        """
+        Replays the video stream to the client video port.
+
+        :return:
+        """
+        period = 1 / self._fps
+        deadline = self._loop.time()
+        frames: Iterator[List[bytes]] = iter(())
+
+        while True:
+            if self.client is not None and self.video_port:
+                frame = next(frames, None)
+                if frame is None:
+                    frames = iter(self._video)
+                    frame = next(frames)
+
+                # Frame numbers keep counting when the stream loops.
+                number = bytes((self._frame_number,))
+                self._frame_number = (self._frame_number + 1) & 0xff
+
+                addr = (self.client[0], self.video_port)
+                for packet in frame:
+                    self.sendto(number + packet[1:], addr)
+
+            deadline += period
+            await asyncio.sleep(max(deadline - self._loop.time(), 0))
+
+    async def start(self, address: Address) -> None:
+        """
+        Starts listening for commands on address.
+
+        :param address:
+        :return:
+        """
+        await self._loop.create_datagram_endpoint(lambda: self, local_addr=address)
+
+        self._tasks.append(self._loop.create_task(self.on_tick()))
+        if self._video:
+            self._tasks.append(self._loop.create_task(self.on_video()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+        if self.transport is not None:
+            self.transport.close()
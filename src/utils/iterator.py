@@ -1,4 +1,8 @@
 import asyncio
+import collections
+import threading
+import weakref
+from typing import Optional
 
 
 # Found in https://bit.ly/2z573zm
@@ -21,3 +25,168 @@ class AsyncIteratorExecutor:
         if value is self:
             raise StopAsyncIteration
         return value
+
+
+class _Raise:
+    """
+    Wraps an exception raised by the iterator in the worker thread.
+    """
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+_END = object()
+
+
+class _Prefetch:
+    """
+    State shared with the worker thread. It doesn't reference the
+    executor, so a dropped executor is collected and stops the worker.
+    """
+    def __init__(self, iterator, loop, prefetch: int):
+        self.iterator = iterator
+        self.loop = loop
+        self.items = collections.deque()
+        self.slots = threading.Semaphore(prefetch)
+        self.lock = threading.Lock()
+        self.waiter: Optional[asyncio.Future] = None
+        self.closed = False
+
+    def stop(self) -> None:
+        """
+        Makes the worker exit instead of producing the next item and
+        wakes up the consumer, which ends the iteration.
+
+        :return:
+        """
+        with self.lock:
+            if self.closed:
+                return
+
+            self.closed = True
+            self.items.clear()
+            waiter, self.waiter = self.waiter, None
+
+        self.slots.release()
+
+        if waiter is not None:
+            self.loop.call_soon_threadsafe(self.wakeup, waiter)
+
+    def fill(self) -> None:
+        """
+        Worker thread body.
+
+        :return:
+        """
+        while True:
+            self.slots.acquire()
+            if self.closed:
+                return
+
+            try:
+                item = next(self.iterator)
+            except StopIteration:
+                item = _END
+            except Exception as error:
+                item = _Raise(error)
+
+            with self.lock:
+                if self.closed:
+                    return
+
+                self.items.append(item)
+                waiter, self.waiter = self.waiter, None
+
+            if waiter is not None:
+                self.loop.call_soon_threadsafe(self.wakeup, waiter)
+
+            if item is _END or isinstance(item, _Raise):
+                return
+
+    @staticmethod
+    def wakeup(waiter: asyncio.Future) -> None:
+        if not waiter.done():
+            waiter.set_result(None)
+
+
+class PrefetchIteratorExecutor:
+    """
+    Variant of AsyncIteratorExecutor that drains the iterator from a
+    single worker thread, keeping up to 'prefetch' items ahead of the
+    consumer. The loop is only woken up when the consumer is waiting,
+    items produced while it is busy are taken from the buffer without
+    a thread round trip and a future per item.
+
+    The worker stops on aclose() and when the executor is garbage
+    collected, e.g. after a 'break' out of 'async for'; after that the
+    iteration ends. Cancelling a single __anext__ leaves it running.
+    Use it as an async context manager to stop it deterministically.
+    """
+    def __init__(self, iterator, loop=None, executor=None, prefetch: int = 64):
+        self.__loop = loop or asyncio.get_event_loop()
+        self.__executor = executor
+        self.__state = _Prefetch(iterator, self.__loop, prefetch)
+        self.__worker: Optional[asyncio.Future] = None
+        weakref.finalize(self, self.__state.stop)
+
+    def __aiter__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+    async def __anext__(self):
+        state = self.__state
+
+        if state.closed:
+            raise StopAsyncIteration
+
+        if self.__worker is None:
+            self.__worker = self.__loop.run_in_executor(self.__executor, state.fill)
+
+        with state.lock:
+            if not state.items:
+                state.waiter = waiter = self.__loop.create_future()
+            else:
+                waiter = None
+
+        if waiter is not None:
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with state.lock:
+                    if state.waiter is waiter:
+                        state.waiter = None
+                raise
+
+            if state.closed:
+                raise StopAsyncIteration
+
+        item = state.items[0]
+
+        if item is _END:
+            raise StopAsyncIteration
+
+        if isinstance(item, _Raise):
+            state.items[0] = _END
+            raise item.error
+
+        state.items.popleft()
+        state.slots.release()
+        return item
+
+    async def aclose(self) -> None:
+        """
+        Stops the worker thread. A call to next() that is blocked in
+        the iterator can't be interrupted, the worker exits as soon
+        as it returns.
+
+        :return:
+        """
+        self.__state.stop()
+
+        if self.__worker is not None:
+            await self.__worker
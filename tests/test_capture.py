@@ -0,0 +1,81 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'src'))
+
+from core.capture import RECEIVED, SENT, LinkCapture, read_capture, replay  # noqa
+from core.link import Link  # noqa
+from core.packet import Packet, stick_packet  # noqa
+from core.protocol import TAKEOFF_CMD  # noqa
+from core.telemetry import FlightData, WifiData  # noqa
+
+
+class Transport(object):
+
+    def sendto(self, data: bytes) -> None:
+        pass
+
+
+class LinkCaptureTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'link.pcap')
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def test_round_trip(self):
+        link = Link(loop=self.loop)
+        link.transport = Transport()
+        received = [FlightData(height=7).packet().encode(1),
+                    WifiData(strength=90).packet().encode(2),
+                    b'\xcc garbage']
+
+        # A tiny buffer goes through the writer thread several times.
+        with LinkCapture(self.path, buffer_size=64) as capture:
+            capture.attach(link)
+
+            link.send(stick_packet(0., .5, -.5, 1.))
+            link.send(Packet(TAKEOFF_CMD))
+            for data in received:
+                link.datagram_received(data, None)
+
+        frames = list(read_capture(self.path))
+
+        self.assertEqual(capture.frames, 5)
+        self.assertEqual([frame.direction for frame in frames],
+                         [SENT, SENT, RECEIVED, RECEIVED, RECEIVED])
+        self.assertEqual([frame.data for frame in frames[2:]], received)
+        self.assertEqual(sorted(frame.timestamp for frame in frames),
+                         [frame.timestamp for frame in frames])
+        self.assertEqual(replay(frames), {'telemetry': 3, 'packets': 1, 'invalid': 1})
+
+    @unittest.skipUnless(os.path.exists('/dev/full'), 'needs /dev/full')
+    def test_write_error_is_raised(self):
+        capture = LinkCapture('/dev/full')
+        deadline = time.monotonic() + 5
+
+        with self.assertRaises(OSError):
+            # The writer thread fails, the error surfaces on a flush
+            # once it has.
+            while time.monotonic() < deadline:
+                capture.record(SENT, bytes(1000))
+                capture.flush()
+
+        with self.assertRaises(OSError):
+            capture.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'src'))
+
+from devices.combos import ComboRecognizer  # noqa
+
+
+class ComboRecognizerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.actions = []
+        self.combos = ComboRecognizer(self.actions.append, loop=self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_chord_fires_once(self):
+        self.combos.chord('flip', ('l', 'r', 'a', 'b'), 'FLIP')
+
+        for button in ('l', 'r', 'a', 'b'):
+            self.combos.press(button, 0.)
+        self.combos.release('b')
+        self.combos.release('a')
+
+        self.assertEqual(self.actions, ['FLIP'])
+
+    def test_release_does_not_fire_chord(self):
+        self.combos.chord('land', ('l',), 'LAND')
+
+        self.combos.press('a', 0.)
+        self.combos.press('l', 0.)
+        self.combos.release('a')
+
+        self.assertEqual(self.actions, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'src'))
+
+from devices.controllers import MouseStick, StickController  # noqa
+
+
+class StickControllerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_abstract(self):
+        with self.assertRaises(TypeError):
+            StickController(loop=self.loop)
+
+    def test_no_burst_after_stall(self):
+        stick = MouseStick(rate=100, loop=self.loop)
+        ticks = []
+        stick.tick = lambda: ticks.append(self.loop.time())
+
+        async def run():
+            stick.start()
+            await asyncio.sleep(.02)
+            # Blocks the loop for ten periods.
+            time.sleep(.1)
+            await asyncio.sleep(.05)
+            await stick.stop()
+
+        self.loop.run_until_complete(run())
+
+        # Ticks right after the stall are still a period apart.
+        gaps = [b - a for a, b in zip(ticks, ticks[1:])]
+        self.assertGreater(min(gaps[3:]), .005)
+
+
+if __name__ == '__main__':
+    unittest.main()
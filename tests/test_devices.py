@@ -0,0 +1,149 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'src'))
+
+from core.metrics import registry  # noqa
+from devices.evdev import ABS_X, EV_ABS, READ_SIZE  # noqa
+from devices.virtual import VirtualGamePad, VirtualInputDevice, syn  # noqa
+
+
+class SupervisorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def test_stop_with_full_buffer(self):
+        device = VirtualGamePad(loop=self.loop, maxsize=1)
+
+        async def run():
+            supervisor = self.loop.create_task(device.start())
+
+            for value in range(10):
+                device.emit(syn((EV_ABS, ABS_X, value)))
+                await asyncio.sleep(.01)
+
+            await asyncio.wait_for(device.stop(), 1)
+            await asyncio.wait_for(supervisor, 1)
+
+        self.loop.run_until_complete(run())
+
+        self.assertIsNone(device.fd)
+        self.assertEqual(device.buffer_qsize, 1)
+        self.assertEqual(device._put_timeouts.value, 19)
+
+    def test_restart_after_unplug(self):
+        device = VirtualGamePad(loop=self.loop)
+
+        async def run():
+            supervisor = self.loop.create_task(device.start())
+            await asyncio.sleep(.01)
+
+            device._writer.close()
+            await asyncio.sleep(.2)
+
+            device.emit(syn((EV_ABS, ABS_X, 7)))
+            event = await asyncio.wait_for(device.get(), 1)
+
+            await device.stop()
+            await supervisor
+            return event
+
+        self.assertEqual(self.loop.run_until_complete(run()).value, 7)
+        self.assertEqual(device.restarts, 1)
+
+
+class VirtualDeviceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.device = VirtualGamePad(loop=self.loop)
+
+    def tearDown(self):
+        self.device.close()
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def test_reads_whole_events(self):
+        self.device.emit(syn(*((EV_ABS, ABS_X, value) for value in range(99))))
+
+        first = list(self.device.read())
+        second = list(self.device.read())
+
+        self.assertEqual(len(first), READ_SIZE // 24)
+        self.assertEqual([event.value for event in first + second], list(range(99)) + [0])
+
+    def test_no_mask_skips_ioctls(self):
+        with mock.patch('devices.base.set_mask') as set_mask, \
+                mock.patch('devices.base.supported') as supported:
+            self.assertTrue(self.device._filter(self.device.fd))
+
+        self.assertFalse(set_mask.called)
+        self.assertFalse(supported.called)
+
+    def test_play_writes_whole_messages(self):
+        # Batches far larger than the socket buffer, written while
+        # the reader drains it.
+        frames = [syn((EV_ABS, ABS_X, value)) for value in range(50000)]
+        events = []
+
+        def ready():
+            try:
+                events.extend(self.device.read())
+            except BlockingIOError:
+                pass
+
+        async def drain():
+            while len(events) < written:
+                await asyncio.sleep(.001)
+
+        self.loop.add_reader(self.device.fd, ready)
+        written = self.loop.run_until_complete(self.device.play(frames, 1e8))
+        self.loop.run_until_complete(asyncio.wait_for(drain(), 5))
+
+        self.assertEqual(written, 100000)
+        self.assertEqual([event.value for event in events[:4]], [0, 0, 1, 0])
+
+
+class MetricsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def test_metrics_per_device(self):
+        first = VirtualGamePad(loop=self.loop, device=VirtualInputDevice('first'))
+        second = VirtualGamePad(loop=self.loop, device=VirtualInputDevice('second'))
+        self.addCleanup(first.close)
+        self.addCleanup(second.close)
+
+        first.put_nowait(None)
+
+        self.assertEqual(first._events_read.value, 1)
+        self.assertEqual(second._events_read.value, 0)
+        self.assertIn('device_buffer_events{device="VirtualGamePad",path="virtual:first"} 1',
+                      registry.render())
+
+    def test_close_unregisters_metrics(self):
+        device = VirtualGamePad(loop=self.loop, device=VirtualInputDevice('closed'))
+        device.close()
+
+        self.assertNotIn('virtual:closed', registry.render())
+
+
+if __name__ == '__main__':
+    unittest.main()
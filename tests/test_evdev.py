@@ -0,0 +1,47 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'src'))
+
+from devices.evdev import (  # noqa
+    EV_KEY, EV_SYN, SYN_DROPPED, SYN_REPORT, FrameAssembler, RawEvent
+)
+
+
+def event(type_: int, code: int, value: int) -> RawEvent:
+    return RawEvent(0, type_, code, value)
+
+
+class FrameAssemblerTest(unittest.TestCase):
+
+    def test_key_after_resync_in_same_batch(self):
+        state = {30}
+        assembler = FrameAssembler(lambda: (state, {}))
+
+        frames = assembler.feed([
+            event(EV_SYN, SYN_DROPPED, 0),
+            event(EV_SYN, SYN_REPORT, 0),
+            event(EV_KEY, 31, 1),
+            event(EV_SYN, SYN_REPORT, 0),
+        ])
+
+        self.assertEqual(frames[0].changes, ((EV_KEY, 30, 1),))
+        self.assertEqual(frames[1].changes, ((EV_KEY, 31, 1),))
+        self.assertEqual(assembler.keys, {30, 31})
+        # The set returned by the device isn't modified.
+        self.assertEqual(state, {30})
+
+        # Both keys were released while events were dropped.
+        state = set()
+        frames = assembler.feed([
+            event(EV_SYN, SYN_DROPPED, 0),
+            event(EV_SYN, SYN_REPORT, 0),
+        ])
+
+        self.assertEqual(frames[0].changes, ((EV_KEY, 30, 0), (EV_KEY, 31, 0)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'src'))
+
+from devices.evdev import (  # noqa
+    ABS_RX, ABS_X, ABS_Y, EV_ABS, EV_KEY, EV_SYN, SYN_REPORT, InputFrame, RawEvent
+)
+from devices.filters import AxisFilter, FilterPipeline, curve  # noqa
+
+
+def frame(**axes):
+    codes = {'x': ABS_X, 'y': ABS_Y}
+    events = [RawEvent(0, EV_ABS, codes[name], value) for name, value in axes.items()]
+    return events + [RawEvent(0, EV_SYN, SYN_REPORT, 0)]
+
+
+class CurveTest(unittest.TestCase):
+
+    def test_linear_range(self):
+        axis = AxisFilter(0, 200, deadzone=0, expo=0)
+
+        self.assertEqual(axis.shape(0), -1.)
+        self.assertEqual(axis.shape(100), 0.)
+        self.assertEqual(axis.shape(150), .5)
+        self.assertEqual(axis.shape(200), 1.)
+
+    def test_out_of_range_values_are_clamped(self):
+        axis = AxisFilter(0, 200, deadzone=0, expo=0)
+
+        self.assertEqual(axis.shape(-50), -1.)
+        self.assertEqual(axis.shape(250), 1.)
+
+    def test_deadzone(self):
+        axis = AxisFilter(-100, 100, deadzone=.1, expo=0)
+
+        self.assertEqual(axis.shape(10), 0.)
+        self.assertEqual(axis.shape(-10), 0.)
+        self.assertAlmostEqual(axis.shape(55), .5)
+        self.assertEqual(axis.shape(100), 1.)
+
+    def test_expo(self):
+        axis = AxisFilter(-100, 100, deadzone=0, expo=1)
+
+        self.assertAlmostEqual(axis.shape(50), .125)
+        self.assertAlmostEqual(axis.shape(-50), -.125)
+        self.assertEqual(axis.shape(100), 1.)
+
+    def test_tables_are_shared(self):
+        self.assertIs(curve(-100, 100, .1, .2), curve(-100, 100, .1, .2))
+        self.assertIs(AxisFilter(-100, 100).table, AxisFilter(-100, 100).table)
+
+    def test_smoothing_range(self):
+        with self.assertRaises(ValueError):
+            AxisFilter(smoothing=1)
+
+
+class FilterPipelineTest(unittest.TestCase):
+
+    def setUp(self):
+        settings = dict(deadzone=0, expo=0, smoothing=.5)
+        self.pipeline = FilterPipeline({
+            ABS_X: AxisFilter(-100, 100, **settings),
+            ABS_Y: AxisFilter(-100, 100, **settings),
+        })
+
+    def test_last_value_of_frame_wins(self):
+        events = frame(x=-100) + frame(x=100)
+        values = self.pipeline.update(events)
+
+        self.assertEqual(values[0], .5)
+        self.assertEqual(self.pipeline[ABS_Y], 0.)
+
+    def test_smoothing_per_frame(self):
+        self.pipeline.update(frame(x=100))
+        self.pipeline.update(frame())
+
+        self.assertEqual(self.pipeline[ABS_X], .75)
+
+    def test_other_events_are_ignored(self):
+        self.pipeline.update([RawEvent(0, EV_KEY, ABS_X, 1), RawEvent(0, EV_ABS, ABS_RX, 100)])
+
+        self.assertEqual(list(self.pipeline.values), [0., 0.])
+
+    def test_batch_matches_frames(self):
+        frames = [frame(x=100, y=-50), frame(y=20), frame(x=-100)]
+        batch = FilterPipeline(dict(zip(self.pipeline.codes, self.pipeline.filters)))
+
+        for data in frames:
+            self.pipeline.update(data)
+
+        self.assertEqual(list(batch.update_batch(frames)), list(self.pipeline.values))
+
+    def test_input_frames(self):
+        frames = [InputFrame(0, ((EV_ABS, ABS_X, 100), (EV_ABS, ABS_Y, -100))),
+                  InputFrame(1, ((EV_ABS, ABS_X, 100),))]
+        values = self.pipeline.update_batch(frames)
+
+        self.assertEqual(list(values), [.75, -.75])
+
+    def test_from_device(self):
+        with mock.patch('devices.filters.supported', return_value=[ABS_X, ABS_Y]), \
+                mock.patch('devices.filters.abs_ranges',
+                           side_effect=lambda fd, codes: {code: (0, 255) for code in codes}):
+            pipeline = FilterPipeline.from_device(0)
+
+        self.assertEqual(pipeline.codes, (ABS_X, ABS_Y))
+        self.assertEqual([(axis.minimum, axis.maximum) for axis in pipeline.filters],
+                         [(0, 255), (0, 255)])
+
+    def test_from_device_without_axis_info(self):
+        with mock.patch('devices.filters.supported', side_effect=OSError):
+            pipeline = FilterPipeline.from_device(0, codes=(ABS_X,))
+
+        self.assertEqual((pipeline.filters[0].minimum, pipeline.filters[0].maximum),
+                         (-32768, 32767))
+
+
+if __name__ == '__main__':
+    unittest.main()
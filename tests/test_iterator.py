@@ -0,0 +1,93 @@
+import asyncio
+import itertools
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'src'))
+
+from utils.iterator import PrefetchIteratorExecutor  # noqa
+
+
+class PrefetchIteratorExecutorTest(unittest.TestCase):
+
+    def run_briefly(self, coro):
+        # asyncio.run waits for the default executor, a worker left
+        # blocked makes it hang.
+        return asyncio.run(asyncio.wait_for(coro, 5))
+
+    def test_items(self):
+        async def consume():
+            return [item async for item in PrefetchIteratorExecutor(iter(range(100)), prefetch=8)]
+
+        self.assertEqual(self.run_briefly(consume()), list(range(100)))
+
+    def test_break_stops_worker(self):
+        async def consume():
+            async for item in PrefetchIteratorExecutor(itertools.count(), prefetch=4):
+                if item == 3:
+                    break
+            return item
+
+        self.assertEqual(self.run_briefly(consume()), 3)
+
+    def test_cancel_keeps_iterating(self):
+        def slow():
+            for item in itertools.count():
+                time.sleep(.01)
+                yield item
+
+        async def consume():
+            iterator = PrefetchIteratorExecutor(slow(), prefetch=1)
+            await iterator.__anext__()
+
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(iterator.__anext__(), .001)
+
+            items = [await iterator.__anext__(), await iterator.__anext__()]
+            await iterator.aclose()
+            return items
+
+        self.assertEqual(self.run_briefly(consume()), [1, 2])
+
+    def test_aclose_ends_iteration(self):
+        async def consume():
+            iterator = PrefetchIteratorExecutor(itertools.count(), prefetch=4)
+            await iterator.__anext__()
+            await iterator.aclose()
+
+            with self.assertRaises(StopAsyncIteration):
+                await iterator.__anext__()
+
+        self.run_briefly(consume())
+
+    def test_aclose_wakes_waiting_consumer(self):
+        def slow():
+            yield 0
+            time.sleep(.2)
+            yield 1
+
+        async def consume():
+            iterator = PrefetchIteratorExecutor(slow(), prefetch=1)
+            await iterator.__anext__()
+            task = asyncio.ensure_future(iterator.__anext__())
+            await asyncio.sleep(.01)
+            await iterator.aclose()
+
+            with self.assertRaises(StopAsyncIteration):
+                await task
+
+        self.run_briefly(consume())
+
+    def test_context_manager(self):
+        async def consume():
+            async with PrefetchIteratorExecutor(itertools.count(), prefetch=4) as iterator:
+                return await iterator.__anext__()
+
+        self.assertEqual(self.run_briefly(consume()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'src'))
+
+from core.bitrate import BitrateController  # noqa
+from core.link import Link  # noqa
+from core.packet import Packet  # noqa
+from core.protocol import VIDEO_RATE_QUERY  # noqa
+
+
+class Transport(object):
+
+    def __init__(self):
+        self.sent = []
+
+    def sendto(self, data: bytes) -> None:
+        self.sent.append(Packet.decode(data))
+
+
+class Clock(asyncio.SelectorEventLoop):
+
+    now = 0.
+
+    def time(self) -> float:
+        return self.now
+
+
+class LinkTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = Clock()
+        asyncio.set_event_loop(self.loop)
+        self.link = Link(loop=self.loop)
+        self.link.transport = Transport()
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def answer(self, packet: Packet) -> None:
+        self.link.datagram_received(
+            Packet(packet.cmd, b'\x00', packet.pkt_type, packet.seq).encode(), None)
+
+    def test_answers_matched_by_sequence(self):
+        self.link.send(Packet(VIDEO_RATE_QUERY))
+        first = self.link.transport.sent[-1]
+
+        self.loop.now = 1.
+        self.link.send(Packet(VIDEO_RATE_QUERY))
+
+        # Late answer of the first probe, timed from the first one.
+        self.loop.now = 1.2
+        self.answer(first)
+
+        self.assertAlmostEqual(self.link.rtt.value, 1.2)
+        self.assertAlmostEqual(self.link.overdue(VIDEO_RATE_QUERY), .2)
+
+    def test_unanswered_probe_steps_down(self):
+        bitrate = BitrateController(self.link, loop=self.loop)
+
+        self.link.send(Packet(VIDEO_RATE_QUERY))
+        self.loop.now = .01
+        self.answer(self.link.transport.sent[-1])
+        self.assertFalse(bitrate.evaluate())
+
+        self.link.send(Packet(VIDEO_RATE_QUERY))
+        self.loop.now = 1.01
+
+        self.assertTrue(bitrate.evaluate())
+        self.assertEqual(bitrate.level, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
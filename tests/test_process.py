@@ -0,0 +1,106 @@
+import copy
+import os
+import struct
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'src'))
+
+from devices.evdev import EV_REL, REL_X, RawEvent  # noqa
+from devices.process import BATCH_SIZE, EventRing, read_events  # noqa
+
+
+def events(start: int, count: int):
+    return [RawEvent(i, EV_REL, REL_X, i) for i in range(start, start + count)]
+
+
+class EventRingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.ring = EventRing(capacity=BATCH_SIZE * 4)
+        # The reader process works on its own copy of the ring.
+        self.producer = copy.copy(self.ring)
+
+    def tearDown(self):
+        self.ring.close()
+        self.ring.unlink()
+
+    def test_push_pull(self):
+        self.producer.push(events(0, 10))
+        self.producer.push(events(10, 10))
+
+        self.assertEqual([event.value for event in self.ring.pull()], list(range(20)))
+        self.assertEqual(self.ring.pull(), [])
+        self.assertEqual(self.ring.overruns, 0)
+
+    def test_idle_producer_loses_nothing(self):
+        self.producer.push(events(0, BATCH_SIZE))
+        self.producer.push(events(BATCH_SIZE, self.ring.capacity - BATCH_SIZE))
+
+        self.assertEqual(len(self.ring.pull()), self.ring.capacity)
+        self.assertEqual(self.ring.overruns, 0)
+
+    def test_lapped_events_are_lost(self):
+        capacity = self.ring.capacity
+
+        for start in range(0, 3 * capacity, BATCH_SIZE):
+            self.producer.push(events(start, BATCH_SIZE))
+        pulled = self.ring.pull()
+
+        self.assertEqual(pulled[0].value, 2 * capacity)
+        self.assertEqual(len(pulled), capacity)
+        self.assertEqual(self.ring.overruns, 2 * capacity)
+
+    def test_slots_being_written_are_lost(self):
+        capacity = self.ring.capacity
+        self.producer.push(events(0, capacity - 10))
+
+        # The producer announces a batch it hasn't published yet.
+        struct.pack_into('Q', self.producer._buf, 8, capacity + 10)
+        pulled = self.ring.pull()
+
+        self.assertEqual(pulled[0].value, 10)
+        self.assertEqual(self.ring.overruns, 10)
+
+    def test_lap_during_copy_is_counted_once(self):
+        capacity = self.ring.capacity
+        self.producer.push(events(0, capacity - 10))
+
+        # The producer runs three rings ahead while the events are
+        # copied, the events past the head are left to the next call.
+        writing = mock.PropertyMock(side_effect=[capacity - 10, 3 * capacity])
+        with mock.patch.object(EventRing, 'writing', writing):
+            pulled = self.ring.pull()
+
+        self.assertEqual(pulled, [])
+        self.assertEqual(self.ring.overruns, capacity - 10)
+        self.assertEqual(self.ring.sequence, capacity - 10)
+
+
+class ReadEventsTest(unittest.TestCase):
+
+    def test_applies_mask_and_grab(self):
+        ring = EventRing(capacity=BATCH_SIZE)
+        self.addCleanup(ring.unlink)
+        self.addCleanup(ring.close)
+        notify, wakeup = os.pipe()
+        self.addCleanup(os.close, notify)
+        self.addCleanup(os.close, wakeup)
+        events = {EV_REL: [REL_X]}
+
+        # The reader process ignores SIGINT, the test process must not.
+        with tempfile.NamedTemporaryFile() as device, \
+                mock.patch('signal.signal'), \
+                mock.patch('devices.process.set_mask') as set_mask, \
+                mock.patch('devices.process.grab') as grab:
+            read_events(device.name, copy.copy(ring), wakeup, events, exclusive=True)
+
+        self.assertIs(set_mask.call_args[0][1], events)
+        self.assertTrue(grab.called)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'src'))
+
+from core.packet import Packet  # noqa
+from core.protocol import LAND_CMD, LOG_DATA_MSG, STICK_CMD, TAKEOFF_CMD  # noqa
+from core.scheduler import LaneScheduler  # noqa
+
+
+class LaneSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.scheduler = LaneScheduler(bulk_size=1, loop=self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+
+    def run_briefly(self) -> None:
+        self.loop.run_until_complete(asyncio.sleep(.01))
+
+    def test_priority(self):
+        for cmd in (LOG_DATA_MSG, STICK_CMD, TAKEOFF_CMD, LAND_CMD):
+            self.scheduler.put_nowait(Packet(cmd))
+
+        self.assertEqual([self.scheduler.get_nowait().cmd for _ in range(4)],
+                         [LAND_CMD, TAKEOFF_CMD, STICK_CMD, LOG_DATA_MSG])
+
+    def test_latest_stick_wins(self):
+        self.scheduler.put_nowait(Packet(STICK_CMD, b'\x01'))
+        self.scheduler.put_nowait(Packet(STICK_CMD, b'\x02'))
+
+        self.assertEqual(self.scheduler.get_nowait().payload, b'\x02')
+        self.assertTrue(self.scheduler.empty())
+
+    def test_concurrent_getters(self):
+        first = self.loop.create_task(self.scheduler.get())
+        second = self.loop.create_task(self.scheduler.get())
+        self.run_briefly()
+
+        self.scheduler.put_nowait(Packet(TAKEOFF_CMD))
+        self.scheduler.put_nowait(Packet(LAND_CMD))
+        self.run_briefly()
+
+        self.assertEqual({first.result().cmd, second.result().cmd}, {TAKEOFF_CMD, LAND_CMD})
+
+    def test_cancelled_getter_passes_wakeup_on(self):
+        first = self.loop.create_task(self.scheduler.get())
+        second = self.loop.create_task(self.scheduler.get())
+        self.run_briefly()
+
+        # The first getter is woken up and cancelled before it runs.
+        self.scheduler.put_nowait(Packet(TAKEOFF_CMD))
+        first.cancel()
+        self.run_briefly()
+
+        self.assertTrue(first.cancelled())
+        self.assertEqual(second.result().cmd, TAKEOFF_CMD)
+
+    def test_cancelled_putter_passes_wakeup_on(self):
+        self.scheduler.put_nowait(Packet(LOG_DATA_MSG, b'\x00'))
+        first = self.loop.create_task(self.scheduler.put(Packet(LOG_DATA_MSG, b'\x01')))
+        second = self.loop.create_task(self.scheduler.put(Packet(LOG_DATA_MSG, b'\x02')))
+        self.run_briefly()
+
+        # The first putter is woken up and cancelled before it runs.
+        self.scheduler.get_nowait()
+        first.cancel()
+        self.run_briefly()
+
+        self.assertTrue(first.cancelled())
+        self.assertTrue(second.done())
+        self.assertEqual(self.scheduler.get_nowait().payload, b'\x02')
+
+
+if __name__ == '__main__':
+    unittest.main()
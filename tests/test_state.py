@@ -0,0 +1,45 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'src'))
+
+from devices.evdev import ABS_X, EV_ABS, EV_KEY, EV_SYN, SYN_REPORT, RawEvent  # noqa
+from devices.state import DeviceState  # noqa
+
+
+def frame(*changes):
+    return [RawEvent(0, *change) for change in changes] + [RawEvent(0, EV_SYN, SYN_REPORT, 0)]
+
+
+class DeviceStateTest(unittest.TestCase):
+
+    def test_snapshot(self):
+        state = DeviceState()
+        state.update(frame((EV_ABS, ABS_X, 10), (EV_KEY, 30, 1)))
+
+        snapshot = state.snapshot()
+        self.assertEqual(snapshot.axes[ABS_X], 10)
+        self.assertTrue(snapshot.pressed(30))
+        self.assertEqual(snapshot.generation, state.generation)
+
+    def test_reused_snapshot_is_detected(self):
+        state = DeviceState()
+        state.update(frame((EV_ABS, ABS_X, 10)))
+
+        snapshot = state.snapshot()
+        generation = snapshot.generation
+        self.assertTrue(state.consistent(snapshot, generation))
+
+        # The next frame is written into the buffer the reader holds.
+        state.update(frame((EV_ABS, ABS_X, 20)))
+        state.update([RawEvent(0, EV_ABS, ABS_X, 30)])
+
+        self.assertFalse(state.consistent(snapshot, generation))
+        self.assertEqual(snapshot.generation & 1, 1)
+        self.assertEqual(state.read(lambda snapshot: snapshot.axes[ABS_X]), 20)
+
+
+if __name__ == '__main__':
+    unittest.main()